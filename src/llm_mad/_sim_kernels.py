@@ -0,0 +1,167 @@
+"""Compiled simulation loops for algorithms that need no LLM calls.
+
+These kernels require the optional `numba` dependency. When it is not
+installed, `AVAILABLE` is False and callers should use the Python loops in
+`simulation` instead.
+
+Every kernel draws reviews like `ReviewSelector`: without replacement from
+each restaurant's pool, reshuffling a pool once it is exhausted. The pools
+are passed flattened, as the review positions of each restaurant
+concatenated in `orders`, with each restaurant's slice given by `starts` and
+`lengths`. Every length must be positive.
+"""
+
+import numpy as np
+
+try:
+  from numba import njit
+except ImportError:  # numba is an optional dependency.
+  njit = None
+
+AVAILABLE = njit is not None
+
+# The average assumed for restaurants without reviews, as in EpsilonGreedy.
+_UNTRIED_AVERAGE = 5.0
+
+
+def _compile(fn):
+  """Compiles a kernel with numba, if it is installed."""
+  return njit(cache=True)(fn) if AVAILABLE else fn
+
+
+@_compile
+def _next_review(
+  orders: np.ndarray,
+  starts: np.ndarray,
+  lengths: np.ndarray,
+  cursors: np.ndarray,
+  restaurant: int,
+) -> int:
+  """Returns the position of a restaurant's next review and advances it."""
+  start = starts[restaurant]
+  length = lengths[restaurant]
+  if cursors[restaurant] >= length:
+    np.random.shuffle(orders[start : start + length])
+    cursors[restaurant] = 0
+  position = orders[start + cursors[restaurant]]
+  cursors[restaurant] += 1
+  return position
+
+
+@_compile
+def _random_argmax(values: np.ndarray) -> int:
+  """Returns the index of a maximum of `values`, breaking ties randomly."""
+  best = values.max()
+  num_best = 0
+  for value in values:
+    if value == best:
+      num_best += 1
+  pick = np.random.randint(0, num_best)
+  for i in range(values.size):
+    if values[i] == best:
+      if pick == 0:
+        return i
+      pick -= 1
+  return values.size - 1
+
+
+@_compile
+def random_choice_loop(
+  ratings: np.ndarray,
+  orders: np.ndarray,
+  starts: np.ndarray,
+  lengths: np.ndarray,
+  num_steps: int,
+  seed: int,
+) -> tuple[np.ndarray, np.ndarray]:
+  """Simulates uniformly random restaurant choices.
+
+  Args:
+      ratings: The rating of every review, indexed by review position.
+      orders: The concatenated review pools, shuffled in place as they are
+        exhausted.
+      starts: The offset of each restaurant's pool in `orders`.
+      lengths: The number of reviews of each restaurant.
+      num_steps: Number of simulation steps to run.
+      seed: The seed for the kernel's random number generator.
+
+  Returns:
+      The chosen restaurant index and the review rating for every step.
+  """
+  np.random.seed(seed)
+  num_restaurants = lengths.size
+  choices = np.empty(num_steps, np.int64)
+  scores = np.empty(num_steps, np.float64)
+  cursors = np.zeros(num_restaurants, np.int64)
+
+  for step in range(num_steps):
+    restaurant = np.random.randint(0, num_restaurants)
+    position = _next_review(orders, starts, lengths, cursors, restaurant)
+    choices[step] = restaurant
+    scores[step] = ratings[position]
+
+  return choices, scores
+
+
+@_compile
+def epsilon_greedy_loop(
+  ratings: np.ndarray,
+  review_scores: np.ndarray,
+  orders: np.ndarray,
+  starts: np.ndarray,
+  lengths: np.ndarray,
+  sums: np.ndarray,
+  counts: np.ndarray,
+  first_choices: np.ndarray,
+  epsilon: float,
+  num_steps: int,
+  seed: int,
+) -> tuple[np.ndarray, np.ndarray]:
+  """Simulates EpsilonGreedy with precomputed review scores.
+
+  Args:
+      ratings: The rating of every review, indexed by review position.
+      review_scores: The quantified score of every review, indexed by review
+        position; these are what the algorithm learns from.
+      orders: The concatenated review pools, shuffled in place as they are
+        exhausted.
+      starts: The offset of each restaurant's pool in `orders`.
+      lengths: The number of reviews of each restaurant.
+      sums: The algorithm's total score per restaurant, updated in place.
+      counts: The algorithm's number of scores per restaurant, updated in
+        place.
+      first_choices: The restaurants still to be tried once each, in order,
+        before the epsilon-greedy strategy starts.
+      epsilon: The probability of choosing a random restaurant.
+      num_steps: Number of simulation steps to run.
+      seed: The seed for the kernel's random number generator.
+
+  Returns:
+      The chosen restaurant index and the review rating for every step.
+  """
+  np.random.seed(seed)
+  num_restaurants = lengths.size
+  choices = np.empty(num_steps, np.int64)
+  scores = np.empty(num_steps, np.float64)
+  cursors = np.zeros(num_restaurants, np.int64)
+  averages = np.full(num_restaurants, _UNTRIED_AVERAGE)
+  for i in range(num_restaurants):
+    if counts[i]:
+      averages[i] = sums[i] / counts[i]
+
+  for step in range(num_steps):
+    if step < first_choices.size:
+      restaurant = first_choices[step]
+    elif np.random.random() < epsilon:
+      restaurant = np.random.randint(0, num_restaurants)
+    else:
+      restaurant = _random_argmax(averages)
+
+    position = _next_review(orders, starts, lengths, cursors, restaurant)
+    choices[step] = restaurant
+    scores[step] = ratings[position]
+    sums[restaurant] += review_scores[position]
+    counts[restaurant] += 1
+    averages[restaurant] = sums[restaurant] / counts[restaurant]
+
+  return choices, scores
@@ -2,6 +2,6 @@
 
 """Exposes LLM client classes and the Model enum."""
 
-from .base import Model
+from .base import BatchLlmClient, Model, RateLimiter
 from .classifier import ReviewClassifier
 from .quantifier import ReviewQuantifier
@@ -1,14 +1,70 @@
 """Defines a base class for LLM API clients."""
 
 import abc
+import asyncio
 import json
 import random
+import re
 import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
 from enum import Enum
-from typing import List, Union
+from typing import Any, List, NamedTuple, TypeVar, Union
 
+import httpx
 import requests
+import xxhash
 from absl import logging
+from requests.adapters import HTTPAdapter
+
+try:
+  import orjson
+except ImportError:  # orjson is an optional speedup.
+  orjson = None
+
+_T = TypeVar("_T")
+
+
+def _json_dumps(obj: Any) -> bytes:
+  """Serializes `obj` to compact JSON bytes, with orjson if it is installed."""
+  if orjson is not None:
+    return orjson.dumps(obj)
+  return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _json_loads(data: bytes) -> Any:
+  """Parses JSON bytes, with orjson if it is installed."""
+  if orjson is not None:
+    return orjson.loads(data)
+  return json.loads(data)
+
+
+# Matches list numbering such as "1." or "2)" that models sometimes prepend.
+_LINE_NUMBER_RE = re.compile(r"^\s*\d+\s*[.):]\s*")
+
+# Matches the first message's content string in a chat completion response
+# body, so it can be read without decoding the rest of the response (usage
+# stats, provider metadata, etc.). Only flat message objects are matched;
+# anything else falls back to a full parse.
+_CONTENT_RE = re.compile(
+  rb'"message"\s*:\s*\{[^{}]*?"content"\s*:\s*"((?:[^"\\]|\\.)*)"'
+)
+
+
+class CacheInfo(NamedTuple):
+  """Statistics of an LLM client's response cache.
+
+  Attributes:
+      hits: The number of lookups answered from the cache.
+      misses: The number of lookups that needed an API call.
+      maxsize: The bound on the in-memory cache, or None if unbounded.
+      currsize: The number of responses in the in-memory cache.
+  """
+
+  hits: int
+  misses: int
+  maxsize: int | None
+  currsize: int
 
 
 class Model(str, Enum):
@@ -22,12 +78,260 @@ class Model(str, Enum):
   GPT_4O = "openai/gpt-4o"
 
 
+class RateLimiter:
+  """Paces async requests to stay within per-minute request and token budgets.
+
+  Each `acquire` reserves the earliest start time allowed by both budgets and
+  then sleeps until it. The reservation happens before the first `await`, so
+  concurrent tasks on one event loop never race for the same slot.
+
+  The request rate adapts to the provider's limits (additive increase,
+  multiplicative decrease): every 429 halves it, and every success raises it
+  by a fixed step, up to the configured maximum.
+  """
+
+  _MIN_REQUESTS_PER_MINUTE = 1.0
+  _RECOVERY_STEP = 1.0  # Requests per minute regained per success.
+
+  def __init__(
+    self,
+    requests_per_minute: float,
+    tokens_per_minute: float | None = None,
+  ) -> None:
+    """Initializes the rate limiter.
+
+    Args:
+        requests_per_minute: The maximum number of requests per minute.
+        tokens_per_minute: The maximum number of (estimated) tokens per minute,
+          or None for no token budget.
+    """
+    if requests_per_minute <= 0:
+      raise ValueError("Requests per minute must be positive.")
+    self._max_requests_per_minute = requests_per_minute
+    self._requests_per_minute = requests_per_minute
+    self._tokens_per_minute = tokens_per_minute
+    self._next_request_time = 0.0
+    self._next_token_time = 0.0
+
+  async def acquire(self, tokens: int = 1) -> None:
+    """Waits until a request using `tokens` tokens may be sent."""
+    now = time.monotonic()
+    start = max(now, self._next_request_time, self._next_token_time)
+    self._next_request_time = start + 60.0 / self._requests_per_minute
+    if self._tokens_per_minute:
+      self._next_token_time = start + 60.0 * tokens / self._tokens_per_minute
+    if start > now:
+      await asyncio.sleep(start - now)
+
+  def on_success(self) -> None:
+    """Additively raises the request rate back towards its maximum."""
+    self._requests_per_minute = min(
+      self._max_requests_per_minute,
+      self._requests_per_minute + self._RECOVERY_STEP,
+    )
+
+  def on_rate_limited(self) -> None:
+    """Halves the request rate after the provider rate limits a request."""
+    self._requests_per_minute = max(
+      self._MIN_REQUESTS_PER_MINUTE, self._requests_per_minute / 2
+    )
+
+
+# Rate limiters shared by all clients using the same API key and model, since
+# the provider enforces its limits per key and model rather than per client.
+_RATE_LIMITERS: dict[tuple[str, str], RateLimiter] = {}
+
+
+def _get_rate_limiter(
+  api_key: str,
+  model_name: str,
+  requests_per_minute: float,
+  tokens_per_minute: float | None,
+) -> RateLimiter:
+  """Returns the shared rate limiter for an API key and model."""
+  key = (api_key, model_name)
+  limiter = _RATE_LIMITERS.get(key)
+  if limiter is None:
+    limiter = _RATE_LIMITERS[key] = RateLimiter(
+      requests_per_minute, tokens_per_minute
+    )
+  return limiter
+
+
+class BatchLlmClient:
+  """Client for an OpenAI-compatible Batch API.
+
+  Batch jobs are processed asynchronously by the provider (within 24 hours) at
+  a reduced price and outside the interactive rate limits. This suits offline
+  simulation sweeps, where all review texts are known up front.
+  """
+
+  _ENDPOINT = "/v1/chat/completions"
+  _COMPLETION_WINDOW = "24h"
+  _POLL_INITIAL_INTERVAL = 5.0  # In seconds
+  _POLL_MAX_INTERVAL = 300.0  # In seconds
+  _TIMEOUT = 60.0  # In seconds
+  _FAILED_STATUSES = frozenset({"failed", "expired", "cancelling", "cancelled"})
+
+  def __init__(
+    self,
+    api_key: str,
+    model: str = "gpt-4o-mini",
+    base_url: str = "https://api.openai.com/v1",
+  ) -> None:
+    """Initializes the batch client.
+
+    Args:
+        api_key: The API key for the batch provider.
+        model: The provider's model ID used for every request in a batch.
+        base_url: The base URL of the provider's API.
+    """
+    if not api_key:
+      raise ValueError("API key cannot be empty.")
+    self._model = model
+    self._base_url = base_url.rstrip("/")
+    self._headers = {"Authorization": f"Bearer {api_key}"}
+
+  def _request(
+    self, method: str, path: str, **kwargs: Any
+  ) -> requests.Response:
+    """Sends a request to the provider, raising on unsuccessful responses."""
+    response = requests.request(
+      method,
+      f"{self._base_url}{path}",
+      headers=self._headers,
+      timeout=self._TIMEOUT,
+      **kwargs,
+    )
+    if not response.ok:
+      raise RuntimeError(
+        f"Batch API returned error {response.status_code}: {response.text}"
+      )
+    return response
+
+  def submit(self, prompts: Sequence[str]) -> str:
+    """Uploads the prompts as a batch job.
+
+    Args:
+        prompts: The prompts to run. Each prompt's position in the sequence is
+          used as its `custom_id`.
+
+    Returns:
+        The ID of the created batch.
+    """
+    lines = [
+      _json_dumps(
+        {
+          "custom_id": str(i),
+          "method": "POST",
+          "url": self._ENDPOINT,
+          "body": {
+            "model": self._model,
+            "messages": [{"role": "user", "content": prompt}],
+          },
+        }
+      )
+      for i, prompt in enumerate(prompts)
+    ]
+    input_file = self._request(
+      "POST",
+      "/files",
+      data={"purpose": "batch"},
+      files={"file": ("batch.jsonl", b"\n".join(lines))},
+    ).json()
+    batch = self._request(
+      "POST",
+      "/batches",
+      json={
+        "input_file_id": input_file["id"],
+        "endpoint": self._ENDPOINT,
+        "completion_window": self._COMPLETION_WINDOW,
+      },
+    ).json()
+    logging.info(
+      "Submitted batch %s with %d requests.", batch["id"], len(lines)
+    )
+    return batch["id"]
+
+  def poll(self, batch_id: str) -> dict[str, str]:
+    """Waits for a batch to complete and downloads its results.
+
+    Args:
+        batch_id: The ID returned by `submit`.
+
+    Returns:
+        A dict mapping each successful request's `custom_id` to the stripped
+        message content. Requests that failed are logged and omitted.
+
+    Raises:
+        RuntimeError: If the batch fails, expires or is cancelled.
+    """
+    interval = self._POLL_INITIAL_INTERVAL
+    while True:
+      batch = self._request("GET", f"/batches/{batch_id}").json()
+      status = batch["status"]
+      if status == "completed":
+        break
+      if status in self._FAILED_STATUSES:
+        raise RuntimeError(f"Batch {batch_id} ended with status '{status}'.")
+      logging.info(
+        "Batch %s is %s. Checking again in %.0f seconds...",
+        batch_id,
+        status,
+        interval,
+      )
+      time.sleep(interval)
+      interval = min(interval * 2, self._POLL_MAX_INTERVAL)
+
+    results: dict[str, str] = {}
+    output_file_id = batch.get("output_file_id")
+    if not output_file_id:
+      return results
+    output = self._request("GET", f"/files/{output_file_id}/content").content
+    for line in output.splitlines():
+      if not line.strip():
+        continue
+      record = _json_loads(line)
+      custom_id = record["custom_id"]
+      try:
+        body = record["response"]["body"]
+        results[custom_id] = body["choices"][0]["message"]["content"].strip()
+      except (KeyError, IndexError, TypeError):
+        logging.warning(
+          "Batch request %s failed: %s", custom_id, record.get("error")
+        )
+    return results
+
+  def run(self, prompts: Sequence[str]) -> list[str]:
+    """Submits the prompts, waits for the batch and returns ordered responses.
+
+    Raises:
+        RuntimeError: If the batch fails or any request has no response.
+    """
+    if not prompts:
+      return []
+    results = self.poll(self.submit(prompts))
+    missing = [i for i in range(len(prompts)) if str(i) not in results]
+    if missing:
+      raise RuntimeError(
+        f"Batch returned no response for {len(missing)} of {len(prompts)} "
+        f"requests (first missing index: {missing[0]})."
+      )
+    return [results[str(i)] for i in range(len(prompts))]
+
+
 class _LlmClientBase(abc.ABC):
   """Abstract base class for clients that call an LLM API."""
 
+  _PAYLOAD_SUFFIX = b"}]}"
+
   _API_URL = "https://openrouter.ai/api/v1/chat/completions"
   _MAX_RETRIES = 5
   _INITIAL_BACKOFF = 1.0  # In seconds
+  _TIMEOUT = 30.0  # In seconds
+  _POOL_SIZE = 32
+  _MAX_ASYNC_CONNECTIONS = 16
+  _CHARS_PER_TOKEN = 4  # Rough estimate for English text.
 
   def __init__(
     self,
@@ -36,10 +340,39 @@ class _LlmClientBase(abc.ABC):
     model: Union[Model, List[Model]] = [m for m in Model],
     site_url: str = "https://github.com/arvinduh/llm_mad",
     app_name: str = "LLM_MAD_Project",
+    batch_client: BatchLlmClient | None = None,
+    cache_dir: str | None = None,
+    max_cache_size: int | None = None,
+    requests_per_minute: float | None = None,
+    tokens_per_minute: float | None = None,
   ) -> None:
-    """Initializes the client."""
+    """Initializes the client.
+
+    Args:
+        api_key: The OpenRouter API key.
+        model: A model, or a list of models to fall back through in order.
+        site_url: The site URL reported to OpenRouter.
+        app_name: The application name reported to OpenRouter.
+        batch_client: An optional Batch API backend used by the `*_all`
+          methods. If None, those methods fall back to one request per review.
+        cache_dir: An optional directory for a persistent response cache that
+          survives process restarts. Requires the `diskcache` package.
+        max_cache_size: An optional bound on the number of in-memory cached
+          responses; the least recently used entries are evicted first. If
+          None, the in-memory cache is unbounded.
+        requests_per_minute: An optional request budget for the async methods,
+          matching the provider's limits for the API key. Clients sharing a
+          key and model share one budget, set by the first of them to send a
+          request. If None, requests are not paced and only rate-limited
+          (429) responses are backed off from.
+        tokens_per_minute: An optional budget of (estimated) tokens per minute
+          for the async methods. Requires `requests_per_minute`.
+    """
     if not api_key:
       raise ValueError("API key cannot be empty.")
+    if tokens_per_minute is not None and requests_per_minute is None:
+      raise ValueError("Tokens per minute requires requests per minute.")
+    self._api_key = api_key
 
     # Store a list of models to try. If only one is provided, make it a list.
     if isinstance(model, Model):
@@ -50,6 +383,15 @@ class _LlmClientBase(abc.ABC):
     # Cache for the working model after first successful discovery
     self._working_model = None
 
+    # Pre-render the constant part of each model's request body, so that only
+    # the prompt has to be serialized per call.
+    self._payload_prefixes = {
+      m: b'{"model":'
+      + _json_dumps(m)
+      + b',"messages":[{"role":"user","content":'
+      for m in self._models
+    }
+
     # Use standard header names; some proxies/hosts reject nonstandard keys.
     self._headers = {
       "Authorization": f"Bearer {api_key}",
@@ -58,91 +400,246 @@ class _LlmClientBase(abc.ABC):
       "Content-Type": "application/json",
     }
 
+    self._session = self._open_session()
+
+    # Pre-encode the headers and parse the URL once for the async path, so
+    # httpx does not normalize them again on every request.
+    self._header_list = [
+      (name.encode(), value.encode()) for name, value in self._headers.items()
+    ]
+    self._url = httpx.URL(self._API_URL)
+
+    self._batch_client = batch_client
+    self._requests_per_minute = requests_per_minute
+    self._tokens_per_minute = tokens_per_minute
+
+    # Responses are deterministic in the prompt, so memoize them by its hash.
+    self._cache: OrderedDict[int, Any] = OrderedDict()
+    self._max_cache_size = max_cache_size
+    self._cache_hits = 0
+    self._cache_misses = 0
+    self._disk_cache = None
+    if cache_dir is not None:
+      import diskcache  # Optional dependency, only needed for this cache.
+
+      self._disk_cache = diskcache.Cache(cache_dir)
+
+    # The async client is opened lazily, on the event loop that first uses it.
+    self._async_client: httpx.AsyncClient | None = None
+    self._async_client_loop: asyncio.AbstractEventLoop | None = None
+
+  def _open_session(self) -> requests.Session:
+    """Returns a new pooled HTTP session sending the client's headers."""
+    # Reuse connections across calls instead of a new TCP+TLS handshake each.
+    # Retries are handled by `_call_api`, so the adapter must not retry.
+    session = requests.Session()
+    session.headers.update(self._headers)
+    adapter = HTTPAdapter(
+      pool_connections=self._POOL_SIZE,
+      pool_maxsize=self._POOL_SIZE,
+      max_retries=0,
+    )
+    session.mount("https://", adapter)
+    return session
+
+  def __getstate__(self) -> dict[str, Any]:
+    """Drops connection state, so clients can be sent to worker processes."""
+    state = self.__dict__.copy()
+    del state["_session"]
+    del state["_url"]
+    state["_async_client"] = None
+    state["_async_client_loop"] = None
+    return state
+
+  def __setstate__(self, state: dict[str, Any]) -> None:
+    """Restores a pickled client with fresh connections."""
+    self.__dict__.update(state)
+    self._session = self._open_session()
+    self._url = httpx.URL(self._API_URL)
+
+  @staticmethod
+  def _cache_key(prompt: str) -> int:
+    """Returns the cache key for a prompt.
+
+    The key is a fixed-size 128-bit digest of the prompt, so entries cost the
+    same however long the review is, and collisions are negligible even for
+    a persistent cache shared across many experiments. It is computed over
+    the prompt's UTF-8 bytes, so keys stored in the persistent cache stay
+    valid across xxhash versions, whatever their handling of `str` input.
+    """
+    return xxhash.xxh3_128_intdigest(prompt.encode("utf-8"))
+
+  def _cache_lookup(self, key: int, *fallback_keys: int) -> Any:
+    """Returns the cached response for a key, or None on a miss.
+
+    If `key` is not cached, `fallback_keys` are tried in order. The lookup
+    counts as a single hit or miss however many keys are tried.
+    """
+    for k in (key, *fallback_keys):
+      value = self._cache.get(k)
+      if value is not None:
+        if self._max_cache_size is not None:
+          self._cache.move_to_end(k)
+      elif self._disk_cache is not None:
+        value = self._disk_cache.get(k)
+        if value is not None:
+          self._remember(k, value)
+      if value is not None:
+        self._cache_hits += 1
+        return value
+    self._cache_misses += 1
+    return None
+
+  def _cache_store(self, key: int, value: Any) -> None:
+    """Stores a parsed response in the in-memory and persistent caches."""
+    self._remember(key, value)
+    if self._disk_cache is not None:
+      self._disk_cache[key] = value
+
+  def _remember(self, key: int, value: Any) -> None:
+    """Adds a response to the in-memory cache, evicting the oldest if full."""
+    self._cache[key] = value
+    if (
+      self._max_cache_size is not None
+      and len(self._cache) > self._max_cache_size
+    ):
+      self._cache.popitem(last=False)
+
+  def clear_cache(self) -> None:
+    """Clears the in-memory response cache, e.g. between experiments.
+
+    The cache statistics are reset too. The persistent cache, if configured,
+    is left intact.
+    """
+    self._cache.clear()
+    self._cache_hits = 0
+    self._cache_misses = 0
+
+  def cache_info(self) -> CacheInfo:
+    """Returns the response cache's statistics since it was last cleared.
+
+    Hits include responses read back from the persistent cache. Reviews
+    answered without a lookup (e.g. by the classifier's local rules) count
+    as neither hits nor misses.
+    """
+    return CacheInfo(
+      self._cache_hits,
+      self._cache_misses,
+      self._max_cache_size,
+      len(self._cache),
+    )
+
+  def _models_to_try(self) -> list[str]:
+    """Returns the models to attempt, starting with the cached working model."""
+    if not self._working_model:
+      return self._models
+    return [self._working_model] + [
+      m for m in self._models if m != self._working_model
+    ]
+
+  def _build_body(self, model_name: str, prompt: str) -> bytes:
+    """Returns the JSON request body for a prompt sent to the given model."""
+    return (
+      self._payload_prefixes[model_name]
+      + _json_dumps(prompt)
+      + self._PAYLOAD_SUFFIX
+    )
+
+  def _parse_success(self, model_name: str, response_body: bytes) -> str:
+    """Caches the model as working and extracts the message content."""
+    # Cache this model as working if it's not already cached
+    if self._working_model != model_name:
+      self._working_model = model_name
+      logging.info("Cached working model: %s", model_name)
+
+    match = _CONTENT_RE.search(response_body)
+    if match is not None:
+      # Only the matched string literal needs to be unescaped.
+      return _json_loads(b'"' + match.group(1) + b'"').strip()
+
+    response_json = _json_loads(response_body)
+    try:
+      return response_json["choices"][0]["message"]["content"].strip()
+    except (KeyError, IndexError, TypeError) as e:
+      raise RuntimeError(
+        f"Unexpected API response shape: {response_json}"
+      ) from e
+
+  def _should_retry(
+    self, model_name: str, status_code: int, backoff_time: float, error: str
+  ) -> bool:
+    """Decides how to handle a non-successful status code.
+
+    Args:
+        model_name: The model that was requested.
+        status_code: The HTTP status code of the response.
+        backoff_time: The delay before the next retry, used for logging.
+        error: A description of the error, used for unrecoverable failures.
+
+    Returns:
+        True if the same model should be retried after backing off, or False
+        if the caller should move on to the next model.
+
+    Raises:
+        RuntimeError: If the error is unrecoverable.
+    """
+    # 429: Rate limited. Wait and retry this same model.
+    if status_code == 429:
+      logging.warning("Rate limited. Retrying in %.2f seconds...", backoff_time)
+      return True
+
+    # 408: Timeout. Wait and retry this same model.
+    if status_code == 408:
+      logging.warning(
+        "Request timed out. Retrying in %.2f seconds...", backoff_time
+      )
+      return True
+
+    # 404: Model not found or unavailable. Stop retrying and move to the next model.
+    if status_code == 404:
+      logging.warning("Model '%s' not found or unavailable (404).", model_name)
+      return False
+
+    # For other client/server errors (e.g., 400, 500), fail fast.
+    raise RuntimeError(f"LLM API returned unrecoverable error: {error}")
+
+  @staticmethod
+  def _next_backoff(backoff_time: float) -> float:
+    """Returns the next backoff delay, with exponential growth and jitter."""
+    return backoff_time * 2 * (1 + random.random())
+
   def _call_api(self, prompt: str) -> str:
     """Handles the core logic of calling the LLM API with retries and fallbacks."""
     last_error = "No models were provided to attempt."
 
-    # If we have a cached working model, try it first
-    models_to_try = (
-      [self._working_model]
-      + [m for m in self._models if m != self._working_model]
-      if self._working_model
-      else self._models
-    )
-
     # Outer loop to iterate through the list of models (for fallback).
-    for model_name in models_to_try:
+    for model_name in self._models_to_try():
       if not self._working_model or model_name != self._working_model:
         logging.info("Attempting to use model: %s", model_name)
-      payload = {
-        "model": model_name,
-        "messages": [{"role": "user", "content": prompt}],
-      }
+      body = self._build_body(model_name, prompt)
       backoff_time = self._INITIAL_BACKOFF
 
       # Inner loop for retrying a single model on transient errors.
       for attempt in range(self._MAX_RETRIES):
         try:
-          response = requests.post(
+          response = self._session.post(
             self._API_URL,
-            headers=self._headers,
-            data=json.dumps(payload),
-            timeout=30,
+            data=body,
+            timeout=self._TIMEOUT,
           )
 
-          # --- Start of Response Handling ---
-
           # On success, parse and return the content immediately.
           if response.ok:
-            # Cache this model as working if it's not already cached
-            if self._working_model != model_name:
-              self._working_model = model_name
-              logging.info("Cached working model: %s", model_name)
-
-            response_json = response.json()
-            try:
-              content = response_json["choices"][0]["message"][
-                "content"
-              ].strip()
-              return content
-            except (KeyError, IndexError, TypeError) as e:
-              raise RuntimeError(
-                f"Unexpected API response shape: {response_json}"
-              ) from e
-
-          # Handle specific, non-successful status codes.
+            return self._parse_success(model_name, response.content)
+
           last_error_body = response.text or "<unable to read response body>"
           last_error = f"{response.status_code}: {last_error_body}"
-
-          # 429: Rate limited. Wait and retry this same model.
-          if response.status_code == 429:
-            logging.warning(
-              "Rate limited. Retrying in %.2f seconds...", backoff_time
-            )
-            time.sleep(backoff_time)
-            backoff_time *= 2 * (1 + random.random())
-            continue
-
-          # 408: Timeout. Wait and retry this same model.
-          if response.status_code == 408:
-            logging.warning(
-              "Request timed out. Retrying in %.2f seconds...", backoff_time
-            )
-            time.sleep(backoff_time)
-            backoff_time *= 2 * (1 + random.random())
-            continue
-
-          # 404: Model not found or unavailable. Stop retrying and move to the next model.
-          if response.status_code == 404:
-            logging.warning(
-              "Model '%s' not found or unavailable (404).", model_name
-            )
-            break  # Breaks from the retry loop to try the next model in the outer loop.
-
-          # For other client/server errors (e.g., 400, 500), fail fast.
-          raise RuntimeError(
-            f"LLM API returned unrecoverable error: {last_error}"
-          )
+          if not self._should_retry(
+            model_name, response.status_code, backoff_time, last_error
+          ):
+            break  # Breaks from the retry loop to try the next model.
+          time.sleep(backoff_time)
+          backoff_time = self._next_backoff(backoff_time)
 
         except requests.exceptions.RequestException as e:
           last_error = str(e)
@@ -151,10 +648,178 @@ class _LlmClientBase(abc.ABC):
             break  # Stop retrying this model and move to the next one.
           time.sleep(backoff_time)
 
-      # This line is reached if the retry loop for a model completes without success or is broken.
-      # The outer loop will then proceed to the next model.
-
     # If the outer loop completes without returning a successful response, all models have failed.
     raise RuntimeError(
       f"Failed to get a valid response from any of the specified models. Last error: {last_error}"
     )
+
+  async def _aget_async_client(self) -> httpx.AsyncClient:
+    """Returns the async HTTP client, opening it on the running event loop.
+
+    Connections in an `httpx.AsyncClient` are tied to the event loop they were
+    opened on, so a new client is created whenever the loop changes (e.g.
+    between separate `asyncio.run` calls), and the stale one is closed.
+    """
+    loop = asyncio.get_running_loop()
+    if self._async_client is not None and self._async_client_loop is loop:
+      return self._async_client
+
+    stale = self._async_client
+    # Install the new client before awaiting, so that concurrent callers
+    # share it instead of each replacing the stale one.
+    self._async_client = httpx.AsyncClient(
+      http2=True,
+      timeout=self._TIMEOUT,
+      limits=httpx.Limits(max_connections=self._MAX_ASYNC_CONNECTIONS),
+    )
+    self._async_client_loop = loop
+    if stale is not None:
+      try:
+        await stale.aclose()
+      except (RuntimeError, httpx.HTTPError) as e:
+        # Its connections may have been torn down with their event loop.
+        logging.debug("Could not close stale async client: %s", e)
+    return self._async_client
+
+  async def _acall_api(self, prompt: str) -> str:
+    """Async version of `_call_api`, sharing its retry and fallback logic."""
+    client = await self._aget_async_client()
+    estimated_tokens = len(prompt) // self._CHARS_PER_TOKEN + 1
+    last_error = "No models were provided to attempt."
+
+    for model_name in self._models_to_try():
+      if not self._working_model or model_name != self._working_model:
+        logging.info("Attempting to use model: %s", model_name)
+      body = self._build_body(model_name, prompt)
+      backoff_time = self._INITIAL_BACKOFF
+      limiter = None
+      if self._requests_per_minute is not None:
+        limiter = _get_rate_limiter(
+          self._api_key,
+          model_name,
+          self._requests_per_minute,
+          self._tokens_per_minute,
+        )
+
+      for attempt in range(self._MAX_RETRIES):
+        try:
+          if limiter is not None:
+            await limiter.acquire(estimated_tokens)
+          request = client.build_request(
+            "POST", self._url, headers=self._header_list, content=body
+          )
+          response = await client.send(request)
+
+          if response.is_success:
+            if limiter is not None:
+              limiter.on_success()
+            return self._parse_success(model_name, response.content)
+
+          if response.status_code == 429 and limiter is not None:
+            limiter.on_rate_limited()
+          last_error_body = response.text or "<unable to read response body>"
+          last_error = f"{response.status_code}: {last_error_body}"
+          if not self._should_retry(
+            model_name, response.status_code, backoff_time, last_error
+          ):
+            break
+          await asyncio.sleep(backoff_time)
+          backoff_time = self._next_backoff(backoff_time)
+
+        except httpx.HTTPError as e:
+          last_error = str(e)
+          if attempt == self._MAX_RETRIES - 1:
+            logging.error("Network error with model '%s': %s", model_name, e)
+            break
+          await asyncio.sleep(backoff_time)
+
+    raise RuntimeError(
+      f"Failed to get a valid response from any of the specified models. Last error: {last_error}"
+    )
+
+  @staticmethod
+  def _format_batch(review_texts: Sequence[str]) -> str:
+    """Formats reviews as a numbered list for a batch prompt."""
+    return "\n".join(
+      f'{i}. "{text}"' for i, text in enumerate(review_texts, start=1)
+    )
+
+  @staticmethod
+  def _split_batch_response(response_text: str, expected: int) -> list[str]:
+    """Splits a batch response into one stripped answer per review.
+
+    Raises:
+        ValueError: If the number of answers does not match `expected`.
+    """
+    lines = [
+      _LINE_NUMBER_RE.sub("", line).strip()
+      for line in response_text.splitlines()
+    ]
+    answers = [line for line in lines if line]
+    if len(answers) != expected:
+      raise ValueError(
+        f"Expected {expected} answers in batch response, got {len(answers)}."
+      )
+    return answers
+
+  def _run_batch_cached(
+    self, batch_prompts: Sequence[str], parse: Callable[[str], _T]
+  ) -> list[_T]:
+    """Answers prompts through the Batch API backend, using the cache.
+
+    Only prompts without a cached answer are submitted, and every parsed
+    answer is cached, so repeated runs do not resubmit finished work.
+
+    Args:
+        batch_prompts: The prompts to answer.
+        parse: Parses and validates one raw response.
+
+    Returns:
+        The parsed answers, in the same order as `batch_prompts`.
+    """
+    keys = [self._cache_key(prompt) for prompt in batch_prompts]
+    results = [self._cache_lookup(key) for key in keys]
+    pending = [i for i, result in enumerate(results) if result is None]
+    if pending:
+      responses = self._batch_client.run([batch_prompts[i] for i in pending])
+      for i, response in zip(pending, responses):
+        results[i] = parse(response)
+        self._cache_store(keys[i], results[i])
+    return results
+
+  async def _agather(
+    self,
+    fn: Callable[[str], Awaitable[_T]],
+    review_texts: Sequence[str],
+    concurrency: int,
+  ) -> list[_T]:
+    """Runs `fn` over all texts, with at most `concurrency` calls in flight.
+
+    Results are returned in the same order as `review_texts`.
+    """
+    if concurrency < 1:
+      raise ValueError("Concurrency must be at least 1.")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(review_text: str) -> _T:
+      async with semaphore:
+        return await fn(review_text)
+
+    return list(await asyncio.gather(*(run_one(t) for t in review_texts)))
+
+  def close(self) -> None:
+    """Closes the pooled HTTP connections of the synchronous session."""
+    self._session.close()
+
+  async def aclose(self) -> None:
+    """Closes the async HTTP client, if one has been opened."""
+    if self._async_client is not None:
+      await self._async_client.aclose()
+      self._async_client = None
+      self._async_client_loop = None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback) -> None:
+    self.close()
@@ -1,5 +1,11 @@
 """Client for converting qualitative reviews into binary classifications."""
 
+import asyncio
+import re
+from collections.abc import Sequence
+
+import numpy as np
+
 from .. import prompts
 from .base import _LlmClientBase
 
@@ -7,6 +13,39 @@ from .base import _LlmClientBase
 class ReviewClassifier(_LlmClientBase):
   """Uses an LLM to classify a restaurant review as 'Good' or 'Bad'."""
 
+  # Unambiguous sentiment markers, used to skip the LLM for obvious reviews.
+  _CONFIDENT_BAD = re.compile(
+    r"\b(terrible|awful|disgusting|worst|inedible|1\s*star)\b", re.I
+  )
+  _CONFIDENT_GOOD = re.compile(
+    r"\b(amazing|excellent|fantastic|best|delicious|5\s*stars?)\b", re.I
+  )
+  _MIN_CONFIDENT_MATCHES = 2
+  _LABELS = ("Good", "Bad")
+
+  @classmethod
+  def _classify_locally(cls, review_text: str) -> str | None:
+    """Classifies reviews with clear-cut sentiment without calling the LLM.
+
+    Returns:
+        "Good" or "Bad" if the review has several markers of one sentiment and
+        none of the other, or None if the LLM should decide.
+    """
+    num_bad = len(cls._CONFIDENT_BAD.findall(review_text))
+    num_good = len(cls._CONFIDENT_GOOD.findall(review_text))
+    if num_good >= cls._MIN_CONFIDENT_MATCHES and num_bad == 0:
+      return "Good"
+    if num_bad >= cls._MIN_CONFIDENT_MATCHES and num_good == 0:
+      return "Bad"
+    return None
+
+  @staticmethod
+  def _parse_label(response_text: str) -> str:
+    """Validates that an LLM response is a 'Good' or 'Bad' label."""
+    if response_text not in ReviewClassifier._LABELS:
+      raise ValueError(f'Invalid classification returned: "{response_text}"')
+    return response_text
+
   def classify(self, review_text: str) -> str:
     """Classifies a review as 'Good' or 'Bad'.
 
@@ -16,10 +55,122 @@ class ReviewClassifier(_LlmClientBase):
     Returns:
         The string "Good" or "Bad".
     """
+    label = self._classify_locally(review_text)
+    if label is not None:
+      return label
+
     prompt = prompts.CLASSIFY_REVIEW_PROMPT.format(review_text=review_text)
-    response_text = self._call_api(prompt)
+    key = self._cache_key(prompt)
+    label = self._cache_lookup(key)
+    if label is None:
+      label = self._parse_label(self._call_api(prompt))
+      self._cache_store(key, label)
+    return label
 
-    if response_text not in ("Good", "Bad"):
-      raise ValueError(f'Invalid classification returned: "{response_text}"')
+  def classify_batch(self, review_texts: Sequence[str]) -> list[str]:
+    """Classifies several reviews with a single LLM request.
 
-    return response_text
+    Args:
+        review_texts: The texts of the restaurant reviews.
+
+    Returns:
+        A list of "Good" or "Bad" labels, in the same order as `review_texts`.
+
+    Raises:
+        ValueError: If the response does not contain exactly one valid label
+          per review.
+    """
+    if not review_texts:
+      return []
+    prompt = prompts.CLASSIFY_REVIEW_BATCH_PROMPT.format(
+      num_reviews=len(review_texts), reviews=self._format_batch(review_texts)
+    )
+    answers = self._split_batch_response(
+      self._call_api(prompt), len(review_texts)
+    )
+
+    # Validate all labels at once rather than one membership test per line.
+    labels = np.asarray(answers)
+    valid = np.isin(labels, self._LABELS)
+    if not valid.all():
+      raise ValueError(
+        f"Invalid classifications returned: {labels[~valid].tolist()}"
+      )
+    return answers
+
+  def classify_all(self, review_texts: Sequence[str]) -> list[str]:
+    """Classifies all reviews, using the Batch API backend if configured.
+
+    Args:
+        review_texts: The texts of the restaurant reviews.
+
+    Returns:
+        A list of "Good" or "Bad" labels, in the same order as `review_texts`.
+    """
+    if self._batch_client is None:
+      return [self.classify(text) for text in review_texts]
+
+    # Clear-cut reviews are labelled locally, as in `classify`.
+    labels = [self._classify_locally(text) for text in review_texts]
+    pending = [i for i, label in enumerate(labels) if label is None]
+    batch_prompts = [
+      prompts.CLASSIFY_REVIEW_PROMPT.format(review_text=review_texts[i])
+      for i in pending
+    ]
+    batch_labels = self._run_batch_cached(batch_prompts, self._parse_label)
+    for i, label in zip(pending, batch_labels):
+      labels[i] = label
+    return labels
+
+  async def aclassify(self, review_text: str) -> str:
+    """Async version of `classify`.
+
+    Args:
+        review_text: The text of the restaurant review.
+
+    Returns:
+        The string "Good" or "Bad".
+    """
+    label = self._classify_locally(review_text)
+    if label is not None:
+      return label
+
+    prompt = prompts.CLASSIFY_REVIEW_PROMPT.format(review_text=review_text)
+    key = self._cache_key(prompt)
+    label = self._cache_lookup(key)
+    if label is None:
+      label = self._parse_label(await self._acall_api(prompt))
+      self._cache_store(key, label)
+    return label
+
+  async def aclassify_many(
+    self, review_texts: Sequence[str], concurrency: int = 10
+  ) -> list[str]:
+    """Classifies many reviews concurrently.
+
+    Args:
+        review_texts: The texts of the restaurant reviews.
+        concurrency: The maximum number of requests in flight at once.
+
+    Returns:
+        A list of "Good" or "Bad" labels, in the same order as `review_texts`.
+    """
+    return await self._agather(self.aclassify, review_texts, concurrency)
+
+  def classify_many(
+    self, review_texts: Sequence[str], concurrency: int = 10
+  ) -> list[str]:
+    """Synchronous wrapper around `aclassify_many`.
+
+    This starts its own event loop, so it cannot be called from inside one
+    (e.g. a notebook cell); `await aclassify_many(...)` there instead.
+    """
+
+    async def run() -> list[str]:
+      try:
+        return await self.aclassify_many(review_texts, concurrency)
+      finally:
+        # The client's connections cannot outlive the loop that owns them.
+        await self.aclose()
+
+    return asyncio.run(run())
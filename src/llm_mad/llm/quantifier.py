@@ -1,5 +1,10 @@
 """Client for converting qualitative reviews into quantitative scores."""
 
+import asyncio
+from collections.abc import Sequence
+
+from absl import logging
+
 from .. import prompts
 from .base import _LlmClientBase
 
@@ -7,6 +12,21 @@ from .base import _LlmClientBase
 class ReviewQuantifier(_LlmClientBase):
   """Uses an LLM to assign a numerical score to a restaurant review."""
 
+  @staticmethod
+  def _parse_score(response_text: str) -> int:
+    """Parses and validates an integer score from an LLM response."""
+    try:
+      score = int(response_text)
+    except (ValueError, IndexError) as e:
+      raise ValueError(
+        f"Failed to parse valid score from LLM response: {e}"
+      ) from e
+
+    if not 1 <= score <= 100:
+      raise ValueError(f"Score {score} is outside the valid range of 1-100.")
+
+    return score
+
   def quantify(self, review_text: str) -> int:
     """Scores a review by sending it to the LLM.
 
@@ -17,16 +37,182 @@ class ReviewQuantifier(_LlmClientBase):
         An integer score between 1 and 100.
     """
     prompt = prompts.QUANTIFY_REVIEW_PROMPT.format(review_text=review_text)
+    key = self._cache_key(prompt)
+    score = self._cache_lookup(key)
+    if score is None:
+      score = self._parse_score(self._call_api(prompt))
+      self._cache_store(key, score)
+    return score
+
+  def quantify_batch(self, review_texts: Sequence[str]) -> list[int]:
+    """Scores several reviews with a single LLM request.
+
+    Args:
+        review_texts: The texts of the restaurant reviews.
+
+    Returns:
+        A list of integer scores between 1 and 100, in the same order as
+        `review_texts`.
+
+    Raises:
+        ValueError: If the response does not contain exactly one valid score
+          per review.
+    """
+    if not review_texts:
+      return []
+    prompt = prompts.QUANTIFY_REVIEW_BATCH_PROMPT.format(
+      num_reviews=len(review_texts), reviews=self._format_batch(review_texts)
+    )
+    answers = self._split_batch_response(
+      self._call_api(prompt), len(review_texts)
+    )
+    return [self._parse_score(answer) for answer in answers]
+
+  def quantify_all(self, review_texts: Sequence[str]) -> list[int]:
+    """Scores all reviews, using the Batch API backend if configured.
+
+    Args:
+        review_texts: The texts of the restaurant reviews.
+
+    Returns:
+        A list of integer scores between 1 and 100, in the same order as
+        `review_texts`.
+    """
+    if self._batch_client is None:
+      return [self.quantify(text) for text in review_texts]
+    batch_prompts = [
+      prompts.QUANTIFY_REVIEW_PROMPT.format(review_text=text)
+      for text in review_texts
+    ]
+    return self._run_batch_cached(batch_prompts, self._parse_score)
+
+  def prequantify(
+    self, review_texts: Sequence[str], batch_size: int = 32
+  ) -> list[float]:
+    """Scores reviews ahead of time, several per request.
+
+    Reviews already in the cache are not sent again. The rest are scored
+    `batch_size` at a time with `quantify_batch`, and every score is cached,
+    so later `prequantify` calls for these reviews are cache hits. Scores
+    from the batch prompt are cached apart from those of the single-review
+    prompt, so `quantify` never returns them and editing either prompt
+    invalidates only its own entries. A batch whose response cannot be used
+    is retried one review at a time with the single-review prompt, and a
+    review that still cannot be scored gets NaN, which is not cached.
+
+    Args:
+        review_texts: The texts of the restaurant reviews.
+        batch_size: The number of reviews sent per request.
+
+    Returns:
+        A list of scores between 1 and 100, or NaN for reviews that could not
+        be scored, in the same order as `review_texts`.
+    """
+    scores = [None] * len(review_texts)
+    single_prompts = [None] * len(review_texts)
+    single_keys = [None] * len(review_texts)
+    batch_keys = [None] * len(review_texts)
+    pending = []
+    for i, text in enumerate(review_texts):
+      single_prompts[i] = prompts.QUANTIFY_REVIEW_PROMPT.format(
+        review_text=text
+      )
+      single_keys[i] = self._cache_key(single_prompts[i])
+      batch_keys[i] = self._batch_cache_key(text)
+      scores[i] = self._cache_lookup(single_keys[i], batch_keys[i])
+      if scores[i] is None:
+        pending.append(i)
+
+    for start in range(0, len(pending), batch_size):
+      chunk = pending[start : start + batch_size]
+      texts = [review_texts[i] for i in chunk]
+      try:
+        batch_scores = self.quantify_batch(texts)
+      except (RuntimeError, ValueError) as e:
+        logging.warning(
+          "Batch of %d reviews failed, scoring them one at a time: %s",
+          len(texts),
+          e,
+        )
+        for i in chunk:
+          scores[i] = self._score_or_nan(single_prompts[i], single_keys[i])
+        continue
+      for i, score in zip(chunk, batch_scores):
+        self._cache_store(batch_keys[i], score)
+        scores[i] = score
+
+    return scores
+
+  def _score_or_nan(self, prompt: str, key: int) -> float:
+    """Scores a single-review prompt known to be a cache miss.
+
+    Unlike `quantify`, this does not look the prompt up again, so each miss
+    is counted once.
 
+    Returns:
+        The score, which is cached, or NaN if the review cannot be scored.
+    """
     try:
-      response_text = self._call_api(prompt)
-      score = int(response_text)
-    except (ValueError, IndexError) as e:
-      raise ValueError(
-        f"Failed to parse valid score from LLM response: {e}"
-      ) from e
+      score = self._parse_score(self._call_api(prompt))
+    except (RuntimeError, ValueError) as e:
+      logging.warning("Quantify failed, leaving the review unscored: %s", e)
+      return float("nan")
+    self._cache_store(key, score)
+    return score
 
-    if not 1 <= score <= 100:
-      raise ValueError(f"Score {score} is outside the valid range of 1-100.")
+  @classmethod
+  def _batch_cache_key(cls, review_text: str) -> int:
+    """Returns the cache key for a review's score from the batch prompt."""
+    return cls._cache_key(
+      prompts.QUANTIFY_REVIEW_BATCH_PROMPT + "\0" + review_text
+    )
+
+  async def aquantify(self, review_text: str) -> int:
+    """Async version of `quantify`.
+
+    Args:
+        review_text: The text of the restaurant review.
 
+    Returns:
+        An integer score between 1 and 100.
+    """
+    prompt = prompts.QUANTIFY_REVIEW_PROMPT.format(review_text=review_text)
+    key = self._cache_key(prompt)
+    score = self._cache_lookup(key)
+    if score is None:
+      score = self._parse_score(await self._acall_api(prompt))
+      self._cache_store(key, score)
     return score
+
+  async def aquantify_many(
+    self, review_texts: Sequence[str], concurrency: int = 10
+  ) -> list[int]:
+    """Scores many reviews concurrently.
+
+    Args:
+        review_texts: The texts of the restaurant reviews.
+        concurrency: The maximum number of requests in flight at once.
+
+    Returns:
+        A list of integer scores between 1 and 100, in the same order as
+        `review_texts`.
+    """
+    return await self._agather(self.aquantify, review_texts, concurrency)
+
+  def quantify_many(
+    self, review_texts: Sequence[str], concurrency: int = 10
+  ) -> list[int]:
+    """Synchronous wrapper around `aquantify_many`.
+
+    This starts its own event loop, so it cannot be called from inside one
+    (e.g. a notebook cell); `await aquantify_many(...)` there instead.
+    """
+
+    async def run() -> list[int]:
+      try:
+        return await self.aquantify_many(review_texts, concurrency)
+      finally:
+        # The client's connections cannot outlive the loop that owns them.
+        await self.aclose()
+
+    return asyncio.run(run())
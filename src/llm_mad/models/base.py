@@ -1,21 +1,51 @@
 """Defines the abstract base class for a multi-armed bandit algorithm."""
 
 import abc
+import random
 from collections.abc import Sequence
 
+import numpy as np
+
 
 class BanditAlgorithm(abc.ABC):
   """Abstract base class for a multi-armed bandit algorithm."""
 
-  def __init__(self, restaurants: Sequence[str]):
+  # Number of random values drawn at once by the buffered draw helpers.
+  _DRAW_BLOCK_SIZE = 4096
+
+  def __init__(self, restaurants: Sequence[str], seed: int | None = None):
     """Initializes the algorithm.
 
     Args:
         restaurants: A sequence of restaurant names (the "arms").
+        seed: An optional seed for the algorithm's random choices, for
+          reproducible runs.
     """
     if not restaurants:
       raise ValueError("Restaurant list cannot be empty.")
     self.restaurants = list(restaurants)
+    # Kept so that fresh copies of the algorithm can replay the same draws.
+    self._seed = seed
+    # A private generator avoids contention on the module-level random state.
+    self._rng = random.Random(seed)
+    # Per-step draws on the hot path are taken from blocks generated in C.
+    self._np_rng = np.random.default_rng(seed)
+    self._index_buffer: list[int] = []
+    self._uniform_buffer: list[float] = []
+
+  def _random_index(self) -> int:
+    """Returns a uniformly random index into `self.restaurants`."""
+    if not self._index_buffer:
+      self._index_buffer = self._np_rng.integers(
+        len(self.restaurants), size=self._DRAW_BLOCK_SIZE
+      ).tolist()
+    return self._index_buffer.pop()
+
+  def _random_uniform(self) -> float:
+    """Returns a uniformly random float in [0, 1)."""
+    if not self._uniform_buffer:
+      self._uniform_buffer = self._np_rng.random(self._DRAW_BLOCK_SIZE).tolist()
+    return self._uniform_buffer.pop()
 
   @abc.abstractmethod
   def select_restaurant(self) -> str:
@@ -2,9 +2,10 @@
 
 """Implementation of the Epsilon-Greedy bandit algorithm using classifications."""
 
-import random
 from collections.abc import Sequence
 
+import numpy as np
+
 from ..llm import quantifier
 from .base import BanditAlgorithm
 
@@ -23,6 +24,7 @@ class EpsilonGreedy(BanditAlgorithm):
     restaurants: Sequence[str],
     quantifier: quantifier.ReviewQuantifier,
     epsilon: float = 0.1,
+    seed: int | None = None,
   ):
     """Initializes the EpsilonGreedy algorithm.
 
@@ -31,8 +33,9 @@ class EpsilonGreedy(BanditAlgorithm):
         quantifier: The ReviewQuantifier used to convert reviews to numerical scores.
         epsilon: The probability of choosing a random arm (exploration).
           Must be between 0.0 and 1.0.
+        seed: An optional seed for the algorithm's random choices.
     """
-    super().__init__(restaurants)
+    super().__init__(restaurants, seed)
     if not 0.0 <= epsilon <= 1.0:
       raise ValueError("Epsilon must be between 0.0 and 1.0.")
     if not quantifier:
@@ -40,8 +43,21 @@ class EpsilonGreedy(BanditAlgorithm):
 
     self.epsilon = epsilon
     self._quantifier = quantifier
-    # Store sum of scores and count of reviews for each restaurant.
-    self.scores: dict[str, list[float]] = {r: [] for r in self.restaurants}
+    # Store sum of scores and count of reviews for each restaurant, aligned
+    # with `self.restaurants`, so averages can be updated incrementally. These
+    # are only ever touched one element at a time, so plain lists avoid the
+    # scalar boxing cost of NumPy element access.
+    self._index_of = {r: i for i, r in enumerate(self.restaurants)}
+    self._sums = [0.0] * len(self.restaurants)
+    self._counts = [0] * len(self.restaurants)
+    # Average score per restaurant. Restaurants with no reviews get a high
+    # score to encourage exploration, but not infinite.
+    self._averages = np.full(len(self.restaurants), 5.0)  # Assume 5-star scale
+    # The best average and the indices of the restaurants tied at it. Updates
+    # change one average at a time, so these are maintained incrementally
+    # instead of being recomputed on every exploitation step.
+    self._best_average = 5.0
+    self._best_indices = list(range(len(self.restaurants)))
     # A counter to ensure each restaurant is selected at least once initially.
     self._initial_rounds_left = list(self.restaurants)
 
@@ -57,31 +73,59 @@ class EpsilonGreedy(BanditAlgorithm):
     if self._initial_rounds_left:
       return self._initial_rounds_left.pop(0)
 
-    if random.random() < self.epsilon:
+    if self._random_uniform() < self.epsilon:
       # Exploration: choose a random restaurant.
-      return random.choice(self.restaurants)
+      return self.restaurants[self._random_index()]
 
     # Exploitation: choose the best-known restaurant based on average score.
-    best_average = -float("inf")
-    best_restaurants = []
-
-    for restaurant in self.restaurants:
-      scores = self.scores[restaurant]
-      if len(scores) == 0:
-        # Give restaurants with no reviews a high score to encourage
-        # exploration, but not infinite.
-        average = 5.0  # Assume 5-star scale
-      else:
-        average = sum(scores) / len(scores)
-
-      if average > best_average:
-        best_average = average
-        best_restaurants = [restaurant]
-      elif average == best_average:
-        best_restaurants.append(restaurant)
-
-    # random.choice handles ties by picking one randomly.
-    return random.choice(best_restaurants)
+    # choice handles ties by picking one randomly.
+    return self.restaurants[self._rng.choice(self._best_indices)]
+
+  def _record(self, restaurant: str, score: float) -> None:
+    """Records a score and refreshes the running average and best arms."""
+    i = self._index_of[restaurant]
+    total = self._sums[i] = self._sums[i] + score
+    count = self._counts[i] = self._counts[i] + 1
+    average = total / count
+    self._averages[i] = average
+
+    if average > self._best_average:
+      self._best_average = average
+      self._best_indices = [i]
+    elif average == self._best_average:
+      if i not in self._best_indices:
+        self._best_indices.append(i)
+    elif i in self._best_indices:
+      # The arm dropped below the best; only rescan if no other arm is tied.
+      self._best_indices.remove(i)
+      if not self._best_indices:
+        self._best_average = self._averages.max()
+        self._best_indices = np.flatnonzero(
+          self._averages == self._best_average
+        ).tolist()
+
+  def _set_totals(self, sums: np.ndarray, counts: np.ndarray) -> None:
+    """Replaces the score totals, e.g. after a simulation run outside Python.
+
+    Args:
+        sums: The total score per restaurant, aligned with `self.restaurants`.
+        counts: The number of scores per restaurant, aligned with
+          `self.restaurants`.
+    """
+    self._sums = sums.tolist()
+    self._counts = counts.tolist()
+    self._averages = np.where(counts > 0, sums / np.maximum(counts, 1), 5.0)
+    self._best_average = self._averages.max()
+    self._best_indices = np.flatnonzero(
+      self._averages == self._best_average
+    ).tolist()
+    # Initial rounds are taken first and in order, so exactly the restaurants
+    # still without a score are left.
+    self._initial_rounds_left = [
+      r
+      for r in self._initial_rounds_left
+      if not self._counts[self._index_of[r]]
+    ]
 
   def update(self, restaurant: str, review_text: str) -> None:
     """Updates the algorithm's knowledge with a new review score.
@@ -90,6 +134,4 @@ class EpsilonGreedy(BanditAlgorithm):
         restaurant: The name of the restaurant that was reviewed.
         review_text: The text of the review.
     """
-    self.scores[restaurant].append(
-      float(self._quantifier.quantify(review_text))
-    )
+    self._record(restaurant, float(self._quantifier.quantify(review_text)))
@@ -2,7 +2,6 @@
 
 """Implementation of the 'Fairweather Friend' baseline algorithm."""
 
-import random
 from collections.abc import Sequence
 
 from ..llm import classifier
@@ -18,15 +17,22 @@ class FairweatherFriend(BanditAlgorithm):
   """
 
   def __init__(
-    self, restaurants: Sequence[str], classifier: classifier.ReviewClassifier
+    self,
+    restaurants: Sequence[str],
+    classifier: classifier.ReviewClassifier,
+    seed: int | None = None,
   ):
     """Initializes the FairweatherFriend algorithm."""
-    super().__init__(restaurants)
+    super().__init__(restaurants, seed)
     if not classifier:
       raise ValueError("A ReviewClassifier is required.")
     self._classifier = classifier
     self._last_choice: str | None = None
     self._last_review_text: str | None = None
+    # Positions of each restaurant, so the last choice can be excluded from a
+    # random draw without rebuilding the list of options every turn.
+    self._index_of = {r: i for i, r in enumerate(self.restaurants)}
+    self._last_index: int | None = None
 
   def select_restaurant(self) -> str:
     """Selects a restaurant based on the last outcome."""
@@ -36,13 +42,20 @@ class FairweatherFriend(BanditAlgorithm):
         return self._last_choice
 
     # If it's the first turn or the last review was bad, choose randomly.
-    options = [r for r in self.restaurants if r != self._last_choice]
-    if not options:
+    num_restaurants = len(self.restaurants)
+    if self._last_index is None:
+      return self.restaurants[self._rng.randrange(num_restaurants)]
+    if num_restaurants == 1:
       return self.restaurants[0]
 
-    return random.choice(options)
+    # Draw from the other restaurants by skipping over the last choice.
+    index = self._rng.randrange(num_restaurants - 1)
+    if index >= self._last_index:
+      index += 1
+    return self.restaurants[index]
 
   def update(self, restaurant: str, review_text: str) -> None:
     """Updates the algorithm with the most recent choice and review text."""
     self._last_choice = restaurant
     self._last_review_text = review_text
+    self._last_index = self._index_of[restaurant]
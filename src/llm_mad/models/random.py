@@ -2,7 +2,6 @@
 
 """Implementation of the 'Random Choice' baseline algorithm."""
 
-import random
 from collections.abc import Sequence
 
 from .base import BanditAlgorithm
@@ -11,13 +10,13 @@ from .base import BanditAlgorithm
 class RandomChoice(BanditAlgorithm):
   """A simple baseline algorithm that chooses a restaurant randomly."""
 
-  def __init__(self, restaurants: Sequence[str]):
+  def __init__(self, restaurants: Sequence[str], seed: int | None = None):
     """Initializes the RandomChoice algorithm."""
-    super().__init__(restaurants)
+    super().__init__(restaurants, seed)
 
   def select_restaurant(self) -> str:
     """Selects a restaurant completely at random."""
-    return random.choice(self.restaurants)
+    return self.restaurants[self._random_index()]
 
   def update(self, restaurant: str, score: int | float) -> None:
     """Does nothing, as this algorithm does not learn."""
@@ -24,3 +24,28 @@ Review:
 
 Classification:
 """
+
+QUANTIFY_REVIEW_BATCH_PROMPT = """
+Analyze each of the following {num_reviews} restaurant reviews and assign each one a quantitative score from 1 to 100.
+A score of 1 represents an extremely negative experience, while a score of 100 represents an overwhelmingly positive one.
+Consider the tone, specific details about food quality, service, and ambiance.
+
+The final output must be exactly {num_reviews} lines, one per review in the given order, each containing a single integer number between 1 and 100 and nothing else. Do not add any numbering, explanation or surrounding text.
+
+Reviews:
+{reviews}
+
+Scores:
+"""
+
+CLASSIFY_REVIEW_BATCH_PROMPT = """
+Is each of the following {num_reviews} restaurant reviews "Good" or "Bad"?
+Consider the tone, specific details about food quality, service, and ambiance.
+
+The final output must be exactly {num_reviews} lines, one per review in the given order, each containing the single word "Good" or the single word "Bad" and nothing else. Do not add any numbering, explanation or surrounding text.
+
+Reviews:
+{reviews}
+
+Classifications:
+"""
@@ -1,11 +1,44 @@
 """Module for selecting random restaurant reviews without replacement."""
 
-import random
+import dataclasses
 from collections.abc import Sequence
+from typing import NamedTuple
 
+import numpy as np
 import pandas as pd
 
 
+class Review(NamedTuple):
+  """A single review returned by a ReviewSelector.
+
+  Attributes:
+      text: The text of the review.
+      rating: The reviewer's numerical rating.
+      index: The position of the review among all reviews of the selector,
+        e.g. for looking up scores computed ahead of time.
+  """
+
+  text: str
+  rating: float
+  index: int
+
+
+@dataclasses.dataclass(slots=True)
+class _RestaurantState:
+  """The reviews of one restaurant and the progress through them.
+
+  Attributes:
+      positions: The row positions of the restaurant's reviews.
+      order: A random permutation of `positions`, redrawn on every reset. It
+        is a list, so reading a position yields a plain int.
+      cursor: The index in `order` of the next review to return.
+  """
+
+  positions: np.ndarray
+  order: list[int]
+  cursor: int = 0
+
+
 class ReviewSelector:
   """Selects random reviews for restaurants without replacement.
 
@@ -23,6 +56,9 @@ class ReviewSelector:
     data: pd.DataFrame,
     restaurant_col: str = "Restaurant",
     restaurants: Sequence[str] | None = None,
+    review_col: str = "Review",
+    rating_col: str = "Rating",
+    seed: int | None = None,
   ) -> None:
     """Initializes the ReviewSelector.
 
@@ -31,34 +67,130 @@ class ReviewSelector:
         restaurant_col: The name of the column containing restaurant names.
         restaurants: An optional sequence of restaurant names to include. If
           None, all unique restaurants from the data are included.
-    """
-    self._restaurant_col = restaurant_col
+        review_col: The name of the column containing the review texts.
+        rating_col: The name of the column containing the numerical ratings.
+        seed: An optional seed for the selection order, for reproducibility.
 
+    Raises:
+        ValueError: If the rating column contains non-numeric values.
+    """
+    # Factorizing hashes each name once, in C. Filtering and grouping then
+    # work on the integer codes instead of comparing the names themselves.
+    codes, names = pd.factorize(data[restaurant_col])
     if restaurants is None:
-      self._data: pd.DataFrame = data.copy()
-      self._restaurants: frozenset[str] = frozenset(
-        data[self._restaurant_col].unique()
-      )
+      # Missing names have no code, so they are not restaurants.
+      restaurant_set = frozenset(names.dropna())
     else:
-      self._restaurants = frozenset(restaurants)
-      self._data = data[
-        data[self._restaurant_col].isin(self._restaurants)
-      ].copy()
+      restaurant_set = frozenset(restaurants)
+      # Test each distinct name once and look rows up by code. Missing names
+      # have code -1, which picks the False appended at the end.
+      allowed = np.append(names.isin(restaurant_set), False)
+      mask = allowed[codes]
+      data = data[mask]
+      codes = codes[mask]
+
+    # Callers only need the text and rating of a review, so keep just those
+    # columns as plain arrays that can be read by position without going
+    # through pandas' indexing machinery. The DataFrame itself is not kept.
+    # Texts are coerced to str once here, so callers never need to.
+    review_indices = self._build_indices(codes, names)
+    no_reviews = np.empty(0, dtype=np.intp)
+    self._init_pools(
+      data[review_col].astype(str).to_numpy(dtype=object),
+      data[rating_col].to_numpy(dtype=np.float64),
+      {
+        restaurant: review_indices.get(str(restaurant), no_reviews)
+        for restaurant in restaurant_set
+      },
+      seed,
+    )
+
+  def _init_pools(
+    self,
+    reviews_arr: np.ndarray,
+    ratings_arr: np.ndarray,
+    positions: dict[str, np.ndarray],
+    seed: int | None,
+  ) -> None:
+    """Sets up the review arrays and a freshly shuffled pool per restaurant.
 
-    self._review_indices: dict[str, list[int]] = self._build_indices()
-    self._shuffled_indices: dict[str, list[int]] = {}
+    Args:
+        reviews_arr: The text of every review, as an object array of str.
+        ratings_arr: The rating of every review, as a float64 array.
+        positions: The positions of each restaurant's reviews in the arrays.
+          Its keys are the restaurants available for selection.
+        seed: An optional seed for the selection order, for reproducibility.
+    """
+    self._seed = seed
+    self._rng = np.random.default_rng(seed)
+    self._restaurants: frozenset[str] = frozenset(positions)
+    self._reviews_arr = reviews_arr
+    self._ratings_arr = ratings_arr
+    # Draws read from list copies, converted once up front, so each returns
+    # native Python objects instead of going through NumPy item access.
+    self._reviews = reviews_arr.tolist()
+    self._ratings = ratings_arr.tolist()
+
+    # All per-restaurant state lives in one dict, so the hot path needs a
+    # single lookup. Restaurants without reviews get an empty state.
+    self._states: dict[str, _RestaurantState] = {}
+    for restaurant, restaurant_positions in positions.items():
+      # Shuffle up front so that selection is just a cursor increment.
+      self._states[restaurant] = _RestaurantState(
+        restaurant_positions,
+        self._rng.permutation(restaurant_positions).tolist(),
+      )
+
+  @staticmethod
+  def _build_indices(
+    codes: np.ndarray, names: pd.Index
+  ) -> dict[str, np.ndarray]:
+    """Builds a map from restaurant name to the row positions of its reviews.
 
-  def _build_indices(self) -> dict[str, list[int]]:
-    """Builds a map from restaurant name to a list of its review indices."""
-    grouped = self._data.groupby(self._restaurant_col)
-    return {str(name): group.index.tolist() for name, group in grouped}
+    Args:
+        codes: The position in `names` of each row's restaurant, or -1 if the
+          name is missing.
+        names: The distinct restaurant names.
+    """
+    if not len(codes):
+      return {}
+    if (codes[1:] >= codes[:-1]).all():
+      # Codes follow the order of first appearance, so data grouped by
+      # restaurant (e.g. sorted by name) is already in order.
+      order = np.arange(len(codes))
+    else:
+      # A stable sort keeps each group's positions in their original order.
+      order = codes.argsort(kind="stable")
+
+    # One vector comparison finds every group boundary at once.
+    sorted_codes = codes[order]
+    boundaries = np.flatnonzero(sorted_codes[1:] != sorted_codes[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    return {
+      str(names[sorted_codes[start]]): positions
+      for start, positions in zip(starts, np.split(order, boundaries))
+      if sorted_codes[start] >= 0
+    }
 
   @property
   def restaurants(self) -> frozenset[str]:
     """Returns the immutable set of available restaurant names."""
     return self._restaurants
 
-  def get_random_review(self, restaurant: str) -> pd.Series:
+  def has_reviews(self, restaurant: str) -> bool:
+    """Returns whether `get_random_review` can return a review right now.
+
+    Args:
+        restaurant: The name of the restaurant.
+
+    Returns:
+        False if the restaurant is unknown, has no reviews, or has had all of
+        its reviews returned since the last reset.
+    """
+    state = self._states.get(restaurant)
+    return state is not None and state.cursor < len(state.order)
+
+  def get_random_review(self, restaurant: str) -> Review:
     """Returns a random, not-yet-seen review for the given restaurant.
 
     Each call for a given restaurant is guaranteed to return a unique review
@@ -68,32 +200,32 @@ class ReviewSelector:
         restaurant: The name of the restaurant.
 
     Returns:
-        A pandas Series representing a single review row.
+        The text and rating of the review.
 
     Raises:
         ValueError: If the restaurant name is not found in the selector.
         IndexError: If all reviews for the restaurant have already been returned.
     """
-    if restaurant not in self._restaurants:
+    state = self._states.get(restaurant)
+    if state is None:
       raise ValueError(f"Restaurant '{restaurant}' not found.")
 
-    if restaurant not in self._review_indices:
-      raise IndexError(f"No reviews available for restaurant '{restaurant}'.")
-
-    if restaurant not in self._shuffled_indices:
-      # First request: Create and shuffle a copy of its review indices.
-      indices = self._review_indices[restaurant][:]
-      random.shuffle(indices)
-      self._shuffled_indices[restaurant] = indices
-
-    available_indices = self._shuffled_indices[restaurant]
-    if not available_indices:
+    order = state.order
+    cursor = state.cursor
+    if cursor >= len(order):
+      if not order:
+        raise IndexError(f"No reviews available for restaurant '{restaurant}'.")
       raise IndexError(
         f"All reviews for restaurant '{restaurant}' have been selected."
       )
 
-    review_index = available_indices.pop()
-    return self._data.loc[review_index]
+    state.cursor = cursor + 1
+    review_position = order[cursor]
+    return Review(
+      self._reviews[review_position],
+      self._ratings[review_position],
+      review_position,
+    )
 
   def reset(self, restaurant: str) -> None:
     """Resets the pool of available reviews for a specific restaurant.
@@ -107,19 +239,55 @@ class ReviewSelector:
     Raises:
         ValueError: If the restaurant name is not found.
     """
-    if restaurant not in self._restaurants:
+    state = self._states.get(restaurant)
+    if state is None:
       raise ValueError(f"Restaurant '{restaurant}' not found.")
-    self._shuffled_indices.pop(restaurant, None)
+    self._reshuffle(state)
 
   def reset_all(self) -> None:
     """Resets the pool of available reviews for all restaurants."""
-    self._shuffled_indices.clear()
+    for state in self._states.values():
+      self._reshuffle(state)
+
+  def _pool_arrays(
+    self, restaurants: Sequence[str]
+  ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray] | None:
+    """Flattens the review pools of some restaurants for compiled loops.
+
+    Args:
+        restaurants: The restaurants whose pools to include, in order.
+
+    Returns:
+        The ratings of all reviews, the shuffled review positions of each
+        restaurant concatenated, and the offset and length of each
+        restaurant's slice; or None if a restaurant is unknown or has no
+        reviews.
+    """
+    orders = []
+    for restaurant in restaurants:
+      state = self._states.get(restaurant)
+      if state is None or not len(state.positions):
+        return None
+      orders.append(self._rng.permutation(state.positions))
+    lengths = np.array([len(order) for order in orders], dtype=np.int64)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return (
+      self._ratings_arr,
+      np.concatenate(orders).astype(np.int64),
+      starts,
+      lengths,
+    )
+
+  def _reshuffle(self, state: _RestaurantState) -> None:
+    """Draws a new review order for a restaurant and rewinds its cursor."""
+    state.order = self._rng.permutation(state.positions).tolist()
+    state.cursor = 0
 
 
 class SynchronizedReviewSelector(ReviewSelector):
   """A ReviewSelector that ensures synchronized timepoints across multiple runs.
 
-  This selector caches review results by (timestep, restaurant) pairs to ensure
+  This selector caches review results by timestep and restaurant to ensure
   that when multiple algorithms choose the same restaurant at the same timestep,
   they receive identical review data. This enables fair comparison of algorithms
   by eliminating randomness in review selection.
@@ -130,6 +298,9 @@ class SynchronizedReviewSelector(ReviewSelector):
     data: pd.DataFrame,
     restaurant_col: str = "Restaurant",
     restaurants: Sequence[str] | None = None,
+    review_col: str = "Review",
+    rating_col: str = "Rating",
+    seed: int | None = None,
   ) -> None:
     """Initializes the SynchronizedReviewSelector.
 
@@ -137,11 +308,52 @@ class SynchronizedReviewSelector(ReviewSelector):
         data: A DataFrame containing the reviews.
         restaurant_col: The name of the column containing restaurant names.
         restaurants: An optional sequence of restaurant names to include.
+        review_col: The name of the column containing the review texts.
+        rating_col: The name of the column containing the numerical ratings.
+        seed: An optional seed for the selection order, for reproducibility.
     """
-    super().__init__(data, restaurant_col, restaurants)
-    self._timestep_cache: dict[tuple[int, str], pd.Series] = {}
+    super().__init__(
+      data, restaurant_col, restaurants, review_col, rating_col, seed
+    )
+    self._init_synchronization()
+
+  def _init_synchronization(self) -> None:
+    """Sets up an empty synchronization cache."""
+    # Cached reviews by timestep, then by restaurant. Nesting avoids building
+    # and hashing a (timestep, restaurant) tuple on every lookup.
+    self._timestep_cache: dict[int, dict[str, Review]] = {}
     self._current_timestep: int = 0
 
+  @classmethod
+  def from_selector(
+    cls, selector: ReviewSelector, seed: int | None = None
+  ) -> "SynchronizedReviewSelector":
+    """Creates a SynchronizedReviewSelector over the reviews of another selector.
+
+    The review arrays are shared with `selector` rather than rebuilt from a
+    DataFrame, but the new selector has its own selection order and progress.
+
+    Args:
+        selector: The selector whose reviews to use.
+        seed: An optional seed for the selection order, for reproducibility.
+          If None, the seed `selector` was created with is used.
+
+    Returns:
+        A new SynchronizedReviewSelector with fresh review pools.
+    """
+    self = cls.__new__(cls)
+    self._init_pools(
+      selector._reviews_arr,
+      selector._ratings_arr,
+      {
+        restaurant: state.positions
+        for restaurant, state in selector._states.items()
+      },
+      selector._seed if seed is None else seed,
+    )
+    self._init_synchronization()
+    return self
+
   def set_timestep(self, timestep: int) -> None:
     """Sets the current timestep for synchronized selection.
 
@@ -152,7 +364,7 @@ class SynchronizedReviewSelector(ReviewSelector):
 
   def get_synchronized_review(
     self, restaurant: str, timestep: int | None = None
-  ) -> pd.Series:
+  ) -> Review:
     """Returns a review for the given restaurant at the specified timestep.
 
     If multiple calls are made with the same (timestep, restaurant) pair,
@@ -164,7 +376,7 @@ class SynchronizedReviewSelector(ReviewSelector):
         timestep: The timestep number. If None, uses current timestep.
 
     Returns:
-        A pandas Series representing a single review row.
+        The text and rating of the review.
 
     Raises:
         ValueError: If the restaurant name is not found.
@@ -173,34 +385,31 @@ class SynchronizedReviewSelector(ReviewSelector):
     if timestep is None:
       timestep = self._current_timestep
 
-    cache_key = (timestep, restaurant)
-
     # Return cached review if available
-    if cache_key in self._timestep_cache:
-      return self._timestep_cache[cache_key]
-
-    # Generate new review and cache it
-    try:
-      review_data = self.get_random_review(restaurant)
-    except IndexError:
-      # If we've exhausted reviews for this restaurant, reset and try again
+    step_cache = self._timestep_cache.get(timestep)
+    if step_cache is None:
+      step_cache = self._timestep_cache[timestep] = {}
+    else:
+      cached = step_cache.get(restaurant)
+      if cached is not None:
+        return cached
+
+    # Generate new review and cache it. If we've exhausted reviews for this
+    # restaurant, reset first.
+    if not self.has_reviews(restaurant):
       self.reset(restaurant)
-      review_data = self.get_random_review(restaurant)
+    review_data = self.get_random_review(restaurant)
 
     # Cache the review for this timestep-restaurant combination
-    self._timestep_cache[cache_key] = review_data
+    step_cache[restaurant] = review_data
     return review_data
 
   def reset_synchronization(self) -> None:
     """Resets the synchronization cache and timestep counter.
 
-    This should be called between different experimental runs to ensure
-    fresh synchronization state.
+    This should be called between different experiments, but not between the
+    algorithms of one experiment: they share the cache so that they see the
+    same reviews. `reset_all` leaves the cache untouched.
     """
     self._timestep_cache.clear()
     self._current_timestep = 0
-
-  def reset_all(self) -> None:
-    """Resets both the underlying review pools and synchronization state."""
-    super().reset_all()
-    self.reset_synchronization()
@@ -2,67 +2,359 @@
 
 """Utilities for running and managing bandit algorithm simulations."""
 
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
 
+import numpy as np
 import pandas as pd
 from absl import logging
-from tqdm.notebook import tqdm
+from tqdm.auto import tqdm
 
-from . import models, reviews
+from . import _sim_kernels, models, reviews
 from .llm import ReviewQuantifier
 
 
+def _results_frame(
+  choices: list,
+  scores: np.ndarray,
+  algorithm_names: Sequence[str],
+  num_steps: int,
+) -> pd.DataFrame:
+  """Builds the results DataFrame of back-to-back simulations.
+
+  Args:
+      choices: The chosen restaurant of every step of every simulation.
+      scores: The score of every step of every simulation.
+      algorithm_names: The algorithm of each simulation, in order.
+      num_steps: The number of steps of each simulation.
+
+  Returns:
+      A DataFrame with "step", "choice", "score" and "algorithm" columns. The
+      "choice" and "algorithm" columns are categorical, so grouping by them
+      compares small integer codes rather than strings.
+  """
+  # Each simulation has a single algorithm, so its codes are just repeated.
+  algorithm_codes, algorithm_categories = pd.factorize(
+    np.asarray(algorithm_names, dtype=object)
+  )
+  # The columns are freshly built arrays, so the frame can wrap them as-is.
+  return pd.DataFrame(
+    {
+      "step": np.tile(
+        np.arange(num_steps, dtype=np.int32), len(algorithm_names)
+      ),
+      "choice": pd.Categorical(choices),
+      "score": scores,
+      "algorithm": pd.Categorical.from_codes(
+        np.repeat(algorithm_codes, num_steps), algorithm_categories
+      ),
+    },
+    copy=False,
+  )
+
+
 def run_simulation(
   algorithm: models.BanditAlgorithm,
   review_selector: reviews.ReviewSelector,
   quantifier: ReviewQuantifier,
   num_steps: int,
+  review_scores: np.ndarray | None = None,
 ) -> pd.DataFrame:
-  """Runs a single simulation for a given bandit algorithm."""
-  history = []
+  """Runs a single simulation for a given bandit algorithm.
+
+  Args:
+      algorithm: The bandit algorithm to simulate.
+      review_selector: The source of reviews for the chosen restaurants.
+      quantifier: The review quantifier for score-based algorithms.
+      num_steps: Number of simulation steps to run.
+      review_scores: Optionally, the score of every review of
+        `review_selector` from `prequantify_all`, used instead of quantifying
+        reviews as they are drawn. With these (and numba installed), an
+        EpsilonGreedy algorithm is simulated in a compiled loop.
+
+  Returns:
+      DataFrame containing the results of the simulation.
+  """
+  choices = [None] * num_steps
+  scores = np.empty(num_steps, dtype=np.float64)
+  _simulate(
+    algorithm,
+    review_selector,
+    quantifier,
+    num_steps,
+    choices,
+    scores,
+    0,
+    review_scores,
+  )
+  return _results_frame(
+    choices, scores, [algorithm.__class__.__name__], num_steps
+  )
+
+
+def _simulate(
+  algorithm: models.BanditAlgorithm,
+  review_selector: reviews.ReviewSelector,
+  quantifier: ReviewQuantifier,
+  num_steps: int,
+  choices: list,
+  scores: np.ndarray,
+  offset: int,
+  review_scores: np.ndarray | None = None,
+  progress: tqdm | None = None,
+) -> None:
+  """Runs a simulation, writing each step's result into preallocated columns.
+
+  Args:
+      algorithm: The bandit algorithm to simulate.
+      review_selector: The source of reviews for the chosen restaurants.
+      quantifier: The review quantifier for score-based algorithms.
+      num_steps: Number of simulation steps to run.
+      choices: The chosen restaurants; step `i` is written to `offset + i`.
+      scores: The scores; step `i` is written to `offset + i`.
+      offset: The position in the columns of the first step's result.
+      review_scores: Optional precomputed review scores, as for
+        `run_simulation`.
+      progress: An optional progress bar shared by several simulations, to
+        advance by one per step. If None, the simulation shows its own.
+  """
+  algorithm_name = algorithm.__class__.__name__
+  if _simulate_compiled(
+    algorithm,
+    review_selector,
+    num_steps,
+    choices,
+    scores,
+    offset,
+    review_scores,
+  ):
+    if progress is not None:
+      progress.update(num_steps)
+    return
+
+  update = _make_update(algorithm, quantifier, review_scores)
   review_selector.reset_all()
 
-  pbar = tqdm(
-    range(num_steps),
-    desc=f"Simulating {algorithm.__class__.__name__}",
-    leave=False,
+  if progress is None:
+    bar = _progress_bar(num_steps, f"Simulating {algorithm_name}")
+  else:
+    bar = progress
+    bar.set_postfix_str(algorithm_name, refresh=False)
+
+  try:
+    for step in range(num_steps):
+      chosen_restaurant = algorithm.select_restaurant()
+
+      if not review_selector.has_reviews(chosen_restaurant):
+        review_selector.reset(chosen_restaurant)
+      review = review_selector.get_random_review(chosen_restaurant)
+
+      update(step, chosen_restaurant, review)
+
+      # For consistent evaluation, we always record a numeric score for
+      # plotting. We use the original star rating here as it's fast and doesn't
+      # require another API call if the algorithm didn't already need a
+      # quantified score.
+      choices[offset + step] = chosen_restaurant
+      scores[offset + step] = review.rating
+      # Count the step only once it is done, so the bar never runs ahead.
+      bar.update(1)
+  finally:
+    if progress is None:
+      bar.close()
+
+
+def _progress_bar(num_steps: int, desc: str, leave: bool = False) -> tqdm:
+  """Returns a progress bar for `num_steps` steps, with throttled redraws.
+
+  The bar is advanced manually with `update`, so callers can count each step
+  once it has finished.
+  """
+  # Redraw the bar at most ~200 times per run, rather than on every step.
+  return tqdm(
+    total=num_steps,
+    desc=desc,
+    leave=leave,
+    mininterval=0.5,
+    miniters=max(1, num_steps // 200),
   )
 
-  for step in pbar:
-    chosen_restaurant = algorithm.select_restaurant()
 
-    try:
-      review_data = review_selector.get_random_review(chosen_restaurant)
-      review_text = str(review_data["Review"])
-    except IndexError:
-      review_selector.reset(chosen_restaurant)
-      review_data = review_selector.get_random_review(chosen_restaurant)
-      review_text = str(review_data["Review"])
-
-    # Models that learn from classification use the raw text for their update.
-    if isinstance(algorithm, (models.FairweatherFriend, models.EpsilonGreedy)):
-      algorithm.update(restaurant=chosen_restaurant, review_text=review_text)
-    else:
-      # Other models (like RandomChoice) use a quantified score.
-      try:
-        score = quantifier.quantify(review_text)
-      except (RuntimeError, ValueError) as e:
-        logging.warning(
-          "Step %d: Quantify failed, using original rating. Error: %s", step, e
-        )
-        score = float(review_data["Rating"])
+def _simulate_compiled(
+  algorithm: models.BanditAlgorithm,
+  review_selector: reviews.ReviewSelector,
+  num_steps: int,
+  choices: list,
+  scores: np.ndarray,
+  offset: int,
+  review_scores: np.ndarray | None,
+) -> bool:
+  """Runs a simulation in a compiled loop, if the algorithm allows it.
 
-      algorithm.update(restaurant=chosen_restaurant, score=score)
+  Two cases qualify, where each step is pure numeric bookkeeping:
+  `RandomChoice`, which ignores its updates, and `EpsilonGreedy` when the
+  scores of all reviews are known up front.
 
-    # For consistent evaluation, we always record a numeric score for plotting.
-    # We use the original star rating here as it's fast and doesn't require
-    # another API call if the algorithm didn't already need a quantified score.
-    eval_score = float(review_data["Rating"])
-    history.append(
-      {"step": step, "choice": chosen_restaurant, "score": eval_score}
+  Returns:
+      Whether the simulation was run; if not, the caller must run it.
+  """
+  if not _sim_kernels.AVAILABLE:
+    return False
+  algorithm_type = type(algorithm)
+  if algorithm_type is models.EpsilonGreedy:
+    if review_scores is None:
+      return False
+  elif algorithm_type is not models.RandomChoice:
+    return False
+
+  restaurants = list(algorithm.restaurants)
+  pools = review_selector._pool_arrays(restaurants)
+  if pools is None:
+    # Let the Python loop raise its usual errors.
+    return False
+
+  ratings, orders, starts, lengths = pools
+  seed = int(algorithm._np_rng.integers(2**31))
+  if algorithm_type is models.RandomChoice:
+    indices, step_scores = _sim_kernels.random_choice_loop(
+      ratings, orders, starts, lengths, num_steps, seed
     )
+  else:
+    sums = np.array(algorithm._sums, dtype=np.float64)
+    counts = np.array(algorithm._counts, dtype=np.int64)
+    first_choices = np.array(
+      [algorithm._index_of[r] for r in algorithm._initial_rounds_left],
+      dtype=np.int64,
+    )
+    indices, step_scores = _sim_kernels.epsilon_greedy_loop(
+      ratings,
+      np.asarray(review_scores, dtype=np.float64),
+      orders,
+      starts,
+      lengths,
+      sums,
+      counts,
+      first_choices,
+      algorithm.epsilon,
+      num_steps,
+      seed,
+    )
+    algorithm._set_totals(sums, counts)
+
+  end = offset + num_steps
+  choices[offset:end] = np.asarray(restaurants, dtype=object)[indices].tolist()
+  scores[offset:end] = step_scores
+  return True
 
-  return pd.DataFrame(history)
+
+def _make_update(
+  algorithm: models.BanditAlgorithm,
+  quantifier: ReviewQuantifier,
+  review_scores: np.ndarray | None = None,
+) -> Callable[[int, str, reviews.Review], None]:
+  """Returns the per-step update for an algorithm.
+
+  The update path depends only on the algorithm's type, so it is chosen once
+  here rather than with an `isinstance` check on every step.
+
+  Args:
+      algorithm: The bandit algorithm to update.
+      quantifier: The review quantifier for score-based algorithms.
+      review_scores: Optional precomputed review scores, as for
+        `run_simulation`, used instead of quantifying reviews as they are
+        drawn.
+
+  Returns:
+      A callable taking the step, chosen restaurant and review.
+  """
+  # RandomChoice ignores its updates, so do not spend a quantify call on them.
+  # Subclasses may learn, hence the exact type check.
+  if type(algorithm) is models.RandomChoice:
+
+    def skip_update(step: int, restaurant: str, review: reviews.Review) -> None:
+      pass
+
+    return skip_update
+
+  if review_scores is not None and not isinstance(
+    algorithm, models.FairweatherFriend
+  ):
+    score_of = np.asarray(review_scores, dtype=np.float64).tolist()
+    # EpsilonGreedy.update scores the review text itself, so hand it the
+    # known score directly.
+    if isinstance(algorithm, models.EpsilonGreedy):
+      record = algorithm._record
+    else:
+      record = algorithm.update
+
+    def update_from_table(
+      step: int, restaurant: str, review: reviews.Review
+    ) -> None:
+      record(restaurant, score_of[review.index])
+
+    return update_from_table
+
+  # Models that learn from classification use the raw text for their update.
+  if isinstance(algorithm, (models.FairweatherFriend, models.EpsilonGreedy)):
+
+    def update_from_text(
+      step: int, restaurant: str, review: reviews.Review
+    ) -> None:
+      algorithm.update(restaurant=restaurant, review_text=review.text)
+
+    return update_from_text
+
+  # Other models use a quantified score.
+  def update_from_score(
+    step: int, restaurant: str, review: reviews.Review
+  ) -> None:
+    try:
+      score = quantifier.quantify(review.text)
+    except (RuntimeError, ValueError) as e:
+      logging.warning(
+        "Step %d: Quantify failed, using original rating. Error: %s", step, e
+      )
+      score = review.rating
+
+    algorithm.update(restaurant=restaurant, score=score)
+
+  return update_from_score
+
+
+def prequantify_all(
+  review_selector: reviews.ReviewSelector,
+  quantifier: ReviewQuantifier,
+  batch_size: int = 32,
+) -> np.ndarray:
+  """Scores every review of a selector once, before any simulation runs.
+
+  This turns one quantify call per simulation step into one call per
+  distinct review, sent `batch_size` reviews per request. Scores are stored
+  in the quantifier's cache, including its persistent cache if configured,
+  so they are not requested again in later sessions.
+
+  Args:
+      review_selector: The selector whose reviews to score.
+      quantifier: The review quantifier to score them with.
+      batch_size: The number of reviews sent per request.
+
+  Returns:
+      The score of every review, indexed by `Review.index`. Reviews that
+      could not be scored get their original rating instead. Pass it as
+      `review_scores` to the simulation functions.
+  """
+  codes, texts = pd.factorize(review_selector._reviews_arr)
+  unique_scores = np.asarray(
+    quantifier.prequantify(texts.tolist(), batch_size), dtype=np.float64
+  )
+  scores = unique_scores[codes]
+  failed = np.isnan(scores)
+  if failed.any():
+    logging.warning(
+      "Quantify failed for %d reviews, using original ratings.",
+      np.count_nonzero(failed),
+    )
+    scores[failed] = review_selector._ratings_arr[failed]
+  return scores
 
 
 def run_experiment(
@@ -70,17 +362,103 @@ def run_experiment(
   review_selector: reviews.ReviewSelector,
   quantifier: ReviewQuantifier,
   num_steps: int,
+  n_jobs: int = 1,
+  review_scores: np.ndarray | None = None,
 ) -> pd.DataFrame:
-  """Runs a full experiment comparing multiple algorithms."""
-  all_results = []
-  for algorithm in tqdm(algorithms, desc="Running Full Experiment"):
-    results_df = run_simulation(
-      algorithm, review_selector, quantifier, num_steps
+  """Runs a full experiment comparing multiple algorithms.
+
+  Args:
+      algorithms: Sequence of bandit algorithms to compare.
+      review_selector: The source of reviews for the chosen restaurants.
+      quantifier: The review quantifier for score-based algorithms.
+      num_steps: Number of simulation steps to run.
+      n_jobs: The number of worker processes to simulate the algorithms in,
+        as for `joblib.Parallel` (-1 uses all cores). With more than one job,
+        each worker simulates a copy of its algorithm, selector and
+        quantifier, so the originals are not updated and responses cached by
+        one worker are not seen by the others. Requires the `joblib` package.
+      review_scores: Optionally, the score of every review from
+        `prequantify_all`, used instead of quantifying reviews as they are
+        drawn.
+
+  Returns:
+      DataFrame containing the results of all algorithms.
+  """
+  choices = [None] * (num_steps * len(algorithms))
+  scores = np.empty(num_steps * len(algorithms), dtype=np.float64)
+  if n_jobs == 1:
+    # One bar over all steps of all algorithms, instead of a new bar for each.
+    progress = _progress_bar(
+      num_steps * len(algorithms), "Running Full Experiment", leave=True
+    )
+    try:
+      for i, algorithm in enumerate(algorithms):
+        _simulate(
+          algorithm,
+          review_selector,
+          quantifier,
+          num_steps,
+          choices,
+          scores,
+          i * num_steps,
+          review_scores,
+          progress,
+        )
+        # The quantifier's cache outlives each simulation, so later algorithms
+        # should mostly hit responses cached by earlier ones.
+        info = quantifier.cache_info()
+        logging.info(
+          "After %s: quantifier cache %d hits, %d misses, %d entries.",
+          algorithm.__class__.__name__,
+          info.hits,
+          info.misses,
+          info.currsize,
+        )
+    finally:
+      progress.close()
+  else:
+    import joblib  # Optional dependency, only needed for parallel runs.
+
+    results = joblib.Parallel(n_jobs=n_jobs, backend="loky")(
+      joblib.delayed(_simulate_columns)(
+        algorithm, review_selector, quantifier, num_steps, review_scores
+      )
+      for algorithm in algorithms
     )
-    results_df["algorithm"] = algorithm.__class__.__name__
-    all_results.append(results_df)
+    for i, (run_choices, run_scores) in enumerate(results):
+      offset = i * num_steps
+      choices[offset : offset + num_steps] = run_choices
+      scores[offset : offset + num_steps] = run_scores
+
+  return _results_frame(
+    choices,
+    scores,
+    [algorithm.__class__.__name__ for algorithm in algorithms],
+    num_steps,
+  )
 
-  return pd.concat(all_results, ignore_index=True)
+
+def _simulate_columns(
+  algorithm: models.BanditAlgorithm,
+  review_selector: reviews.ReviewSelector,
+  quantifier: ReviewQuantifier,
+  num_steps: int,
+  review_scores: np.ndarray | None,
+) -> tuple[list, np.ndarray]:
+  """Runs a simulation and returns its choice and score columns."""
+  choices = [None] * num_steps
+  scores = np.empty(num_steps, dtype=np.float64)
+  _simulate(
+    algorithm,
+    review_selector,
+    quantifier,
+    num_steps,
+    choices,
+    scores,
+    0,
+    review_scores,
+  )
+  return choices, scores
 
 
 def run_synchronized_experiment(
@@ -88,6 +466,7 @@ def run_synchronized_experiment(
   review_selector: reviews.ReviewSelector,
   quantifier: ReviewQuantifier,
   num_steps: int,
+  review_scores: np.ndarray | None = None,
 ) -> pd.DataFrame:
   """Runs a synchronized experiment where all algorithms use the same timepoints.
 
@@ -100,22 +479,26 @@ def run_synchronized_experiment(
       review_selector: The review selector (will be wrapped in SynchronizedReviewSelector).
       quantifier: The review quantifier for score-based algorithms.
       num_steps: Number of simulation steps to run.
+      review_scores: Optionally, the score of every review of
+        `review_selector` from `prequantify_all`, used instead of quantifying
+        reviews as they are drawn.
 
   Returns:
       DataFrame containing results for all algorithms with synchronized timepoints.
   """
-  # Create synchronized review selector
-  sync_selector = reviews.SynchronizedReviewSelector(
-    review_selector._data,
-    review_selector._restaurant_col,
-    list(review_selector.restaurants),
+  # Create synchronized review selector. Its review cache must persist across
+  # algorithms, so it is not reset between them.
+  sync_selector = reviews.SynchronizedReviewSelector.from_selector(
+    review_selector
   )
 
-  all_results = []
+  choices = [None] * (num_steps * len(algorithms))
+  scores = np.empty(num_steps * len(algorithms), dtype=np.float64)
 
-  for algorithm in tqdm(algorithms, desc="Running Synchronized Experiment"):
-    history = []
-    sync_selector.reset_all()
+  for i, algorithm in enumerate(
+    tqdm(algorithms, desc="Running Synchronized Experiment")
+  ):
+    offset = i * num_steps
 
     # Reset algorithm state (create fresh copy)
     algorithm_class = algorithm.__class__
@@ -124,59 +507,45 @@ def run_synchronized_experiment(
       if hasattr(algorithm, "epsilon") and hasattr(algorithm, "_quantifier"):
         # EpsilonGreedy
         fresh_algorithm = algorithm_class(
-          algorithm.restaurants, algorithm._quantifier, algorithm.epsilon
+          algorithm.restaurants,
+          algorithm._quantifier,
+          algorithm.epsilon,
+          seed=algorithm._seed,
         )
       elif hasattr(algorithm, "_classifier"):
         # FairweatherFriend
         fresh_algorithm = algorithm_class(
-          algorithm.restaurants, algorithm._classifier
+          algorithm.restaurants, algorithm._classifier, seed=algorithm._seed
         )
       else:
         # RandomChoice or other simple algorithms
-        fresh_algorithm = algorithm_class(algorithm.restaurants)
+        fresh_algorithm = algorithm_class(
+          algorithm.restaurants, seed=algorithm._seed
+        )
     else:
       fresh_algorithm = algorithm
 
+    # The update path depends only on the algorithm's type, so pick it once.
+    update = _make_update(fresh_algorithm, quantifier, review_scores)
+
     for step in range(num_steps):
       chosen_restaurant = fresh_algorithm.select_restaurant()
 
       # Get synchronized review for this timestep and restaurant
-      review_data = sync_selector.get_synchronized_review(
-        chosen_restaurant, step
-      )
-      review_text = str(review_data["Review"])
+      review = sync_selector.get_synchronized_review(chosen_restaurant, step)
 
-      # Update algorithm based on its type
-      if isinstance(fresh_algorithm, models.FairweatherFriend):
-        fresh_algorithm.update(
-          restaurant=chosen_restaurant, review_text=review_text
-        )
-      else:
-        # Other models (like RandomChoice and EpsilonGreedy) use a quantified score
-        try:
-          score = quantifier.quantify(review_text)
-        except (RuntimeError, ValueError) as e:
-          logging.warning(
-            "Step %d: Quantify failed, using original rating. Error: %s",
-            step,
-            e,
-          )
-          score = float(review_data["Rating"])
-
-        fresh_algorithm.update(restaurant=chosen_restaurant, score=score)
+      update(step, chosen_restaurant, review)
 
       # Record the result
-      eval_score = float(review_data["Rating"])
-      history.append(
-        {"step": step, "choice": chosen_restaurant, "score": eval_score}
-      )
-
-    # Convert to DataFrame and add algorithm name
-    results_df = pd.DataFrame(history)
-    results_df["algorithm"] = algorithm.__class__.__name__
-    all_results.append(results_df)
-
-  return pd.concat(all_results, ignore_index=True)
+      choices[offset + step] = chosen_restaurant
+      scores[offset + step] = review.rating
+
+  return _results_frame(
+    choices,
+    scores,
+    [algorithm.__class__.__name__ for algorithm in algorithms],
+    num_steps,
+  )
 
 
 def create_synchronized_experiment(
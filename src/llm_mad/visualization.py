@@ -1,6 +1,7 @@
 """Functions for plotting the results of bandit algorithm simulations."""
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import seaborn as sns
 
@@ -9,11 +10,20 @@ sns.set_theme(style="whitegrid")
 
 def plot_cumulative_reward(results: pd.DataFrame, title: str):
   """Plots the cumulative reward over time for each algorithm."""
-  plt.figure(figsize=(12, 7))
-  for algorithm_name, data in results.groupby("algorithm"):
-    data["cumulative_score"] = data["score"].cumsum()
-    sns.lineplot(
-      x="step", y="cumulative_score", data=data, label=algorithm_name
+  _, ax = plt.subplots(figsize=(12, 7))
+  plot_data = results.sort_values(["algorithm", "step"])
+  plot_data = plot_data.assign(
+    cumulative_score=plot_data.groupby("algorithm", observed=True)[
+      "score"
+    ].cumsum()
+  )
+  # There is one score per algorithm and step, so there is nothing for
+  # seaborn's estimator to aggregate; plot each line directly.
+  for name, group in plot_data.groupby("algorithm", sort=False, observed=True):
+    ax.plot(
+      group["step"].to_numpy(),
+      group["cumulative_score"].to_numpy(),
+      label=name,
     )
   plt.title(title, fontsize=16)
   plt.xlabel("Time Step")
@@ -24,8 +34,11 @@ def plot_cumulative_reward(results: pd.DataFrame, title: str):
 
 def plot_restaurant_choices(results: pd.DataFrame, title: str):
   """Plots a bar chart of how many times each restaurant was chosen."""
-  plt.figure(figsize=(12, 7))
-  sns.countplot(x="choice", hue="algorithm", data=results)
+  _, ax = plt.subplots(figsize=(12, 7))
+  # Count every (restaurant, algorithm) pair in one grouped pass, rather than
+  # letting countplot aggregate bar by bar.
+  counts = pd.crosstab(results["choice"], results["algorithm"])
+  counts.plot.bar(ax=ax, width=0.8)
   plt.title(title, fontsize=16)
   plt.xlabel("Restaurant")
   plt.ylabel("Number of Times Chosen")
@@ -39,14 +52,21 @@ def plot_average_reward_over_time(
   results: pd.DataFrame, title: str, window_size: int = 25
 ):
   """Plots the rolling average reward over time for each algorithm."""
-  plt.figure(figsize=(12, 7))
-  for algorithm_name, data in results.groupby("algorithm"):
-    data["rolling_avg"] = data["score"].rolling(window=window_size).mean()
-    sns.lineplot(
-      x="step",
-      y="rolling_avg",
-      data=data,
-      label=f"{algorithm_name} (ws={window_size})",
+  if window_size <= 0:
+    raise ValueError("window_size must be positive")
+  _, ax = plt.subplots(figsize=(12, 7))
+  plot_data = results.sort_values(["algorithm", "step"])
+  for name, group in plot_data.groupby("algorithm", sort=False, observed=True):
+    # Each window's sum is the difference of two running totals, so the
+    # averages take one pass. Steps before the first full window are skipped.
+    totals = np.concatenate(
+      ([0.0], np.cumsum(group["score"].to_numpy(dtype=np.float64)))
+    )
+    rolling_avg = (totals[window_size:] - totals[:-window_size]) / window_size
+    ax.plot(
+      group["step"].to_numpy()[window_size - 1 :],
+      rolling_avg,
+      label=f"{name} (ws={window_size})",
     )
   plt.title(title, fontsize=16)
   plt.xlabel("Time Step")
@@ -64,20 +84,20 @@ def plot_ratings_over_time(results: pd.DataFrame, algorithm_name: str):
     algorithm_name: Name of the algorithm to plot
   """
   # Filter data for the specific algorithm
-  algorithm_data = results[results["algorithm"] == algorithm_name].copy()
+  algorithm_data = results[results["algorithm"] == algorithm_name]
   if algorithm_data.empty:
     print(f"No data found for algorithm: {algorithm_name}")
     return
 
   # Sort by step to ensure proper ordering
   algorithm_data = algorithm_data.sort_values("step")
-  all_ratings = algorithm_data["score"].tolist()
+  all_ratings = algorithm_data["score"].to_numpy(dtype=np.float64)
 
-  # Create a list of days for the x-axis
-  days_list = list(range(1, len(all_ratings) + 1))
+  # Create the days for the x-axis
+  days_list = np.arange(1, len(all_ratings) + 1)
 
   # Calculate the running average of ratings
-  running_average = pd.Series(all_ratings).expanding().mean()
+  running_average = np.cumsum(all_ratings) / days_list
 
   # Create the plot
   plt.figure(figsize=(12, 6))
@@ -117,14 +137,18 @@ def plot_algorithm_choices_timeline(results: pd.DataFrame, title: str):
   # Plot timeline for each algorithm
   for i, algorithm in enumerate(algorithms):
     alg_data = results[results["algorithm"] == algorithm].sort_values("step")
+    # Plain arrays, so each restaurant's mask is a single NumPy comparison.
+    steps = alg_data["step"].to_numpy()
+    alg_choices = alg_data["choice"].to_numpy()
 
     # Plot points colored by restaurant choice
     for restaurant in restaurants:
-      mask = alg_data["choice"] == restaurant
-      if mask.any():
+      mask = alg_choices == restaurant
+      num_chosen = np.count_nonzero(mask)
+      if num_chosen:
         plt.scatter(
-          alg_data[mask]["step"],
-          [i] * sum(mask),
+          steps[mask],
+          np.full(num_chosen, i),
           c=[restaurant_colors[restaurant]],
           label=restaurant
           if i == 0